@@ -4,7 +4,7 @@ set -e
 echo "🚀 Starting Django application..."
 
 # Определяем путь к Python
-PYTHON_CMD="/usr/local/bin/python"
+PYTHON_CMD="${PYTHON_CMD:-/usr/local/bin/python}"
 if [ ! -x "$PYTHON_CMD" ]; then
     PYTHON_CMD="/usr/bin/python"
 fi
@@ -20,43 +20,41 @@ fi
 
 echo "🐍 Using Python: $PYTHON_CMD"
 
+# Подготовка в одном процессе Django: ожидание базы и Redis, затем migrate и
+# collectstatic, только если метка сборки образа показывает, что они нужны.
+# STARTUP_MODE=full - выполнить все всегда, skip - сразу запускать сервер
+# (реплики при автомасштабировании, миграции применяет отдельный запуск)
+STARTUP_ARGS="--timeout=${WAIT_FOR_DB_TIMEOUT:-30}"
+if [ "${STARTUP_MODE:-fast}" = "full" ]; then
+    STARTUP_ARGS="$STARTUP_ARGS --force"
+fi
+
 # Проверяем тип базы данных
 if [ "$DB_ENGINE" = "django.db.backends.sqlite3" ]; then
     echo "📁 Using SQLite database for testing..."
-    
-    # Создаем миграции и применяем их
-    echo "🔄 Running migrations..."
-    $PYTHON_CMD manage.py makemigrations --noinput || true
-    $PYTHON_CMD manage.py migrate --noinput
-    
-    # Создаем суперпользователя для тестирования
-    echo "👤 Creating test superuser..."
-    $PYTHON_CMD manage.py shell -c "
-from django.contrib.auth.models import User
-if not User.objects.filter(username='admin').exists():
-    User.objects.create_superuser('admin', 'admin@test.com', 'admin123')
-    print('Superuser created: admin/admin123')
-else:
-    print('Superuser already exists')
-" || true
-    
+    # Тестовый суперпользователь admin/admin123
+    STARTUP_ARGS="$STARTUP_ARGS --test-superuser"
 else
     echo "🐘 Using PostgreSQL database..."
-    # Ждем подключения к базе данных
-    echo "⏳ Waiting for database connection..."
-    $PYTHON_CMD manage.py wait_for_db --timeout=30 || true
-    
-    # Применяем миграции
-    echo "🔄 Running migrations..."
-    $PYTHON_CMD manage.py migrate --noinput
 fi
 
-# Собираем статические файлы
-echo "📦 Collecting static files..."
-$PYTHON_CMD manage.py collectstatic --noinput || true
+if [ "${STARTUP_MODE:-fast}" = "skip" ]; then
+    echo "⏭️ Skipping startup preparation (STARTUP_MODE=skip)"
+else
+    echo "⏳ Waiting for services, checking migrations and static files..."
+    $PYTHON_CMD manage.py startup $STARTUP_ARGS
+fi
 
-# Запускаем сервер
-echo "🌐 Starting Django development server..."
-# Запускаем Django в однопоточном режиме
-echo "🔒 Starting Django in single-threaded mode"
-$PYTHON_CMD manage.py runserver 0.0.0.0:8000 --noreload --verbosity=0 --nothreading 
\ No newline at end of file
+# Запускаем сервер: gunicorn (WSGI, по умолчанию), uvicorn (ASGI) или runserver для отладки
+if [ "${APP_SERVER:-gunicorn}" = "runserver" ]; then
+    echo "🌐 Starting Django development server..."
+    echo "🔒 Starting Django in single-threaded mode"
+    exec $PYTHON_CMD manage.py runserver 0.0.0.0:8000 --noreload --verbosity=0 --nothreading
+elif [ "$APP_SERVER" = "uvicorn" ]; then
+    echo "🦄 Starting gunicorn with uvicorn workers (ASGI)..."
+    exec $PYTHON_CMD -m gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker dojo.asgi:application
+else
+    # exec: gunicorn получает сигналы контейнера (TERM - мягкая остановка, HUP - перезапуск воркеров)
+    echo "🦄 Starting gunicorn..."
+    exec $PYTHON_CMD -m gunicorn -c gunicorn.conf.py dojo.wsgi:application
+fi
@@ -1 +1,13 @@
-# Defect Dojo Django Application 
\ No newline at end of file
+# Defect Dojo Django Application
+
+
+def __getattr__(name):
+    # Celery с kombu загружаются при первом обращении: веб-процессу они нужны
+    # только для постановки задач, а `celery -A dojo` находит dojo.celery сам
+    if name == 'celery_app':
+        from .celery import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ('celery_app',)
@@ -0,0 +1,38 @@
+"""
+Admin configuration for Defect Dojo.
+"""
+from django.contrib import admin
+from django.db import transaction
+
+from dojo.cache import invalidate_findings
+from dojo.models import Engagement, Finding, Product
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ('name', 'created')
+    search_fields = ('name',)
+
+
+@admin.register(Engagement)
+class EngagementAdmin(admin.ModelAdmin):
+    list_display = ('name', 'product', 'created')
+    list_select_related = ('product',)
+
+
+@admin.register(Finding)
+class FindingAdmin(admin.ModelAdmin):
+    list_display = ('title', 'severity', 'status', 'scanner', 'product', 'engagement')
+    list_filter = ('severity', 'status', 'scanner')
+    list_select_related = ('product', 'engagement')
+    search_fields = ('title', 'fingerprint')
+
+    # Находки удаляются без сигналов (см. dojo.signals), поэтому кеш списков
+    # сбрасывается здесь, один раз на удаление
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        transaction.on_commit(invalidate_findings)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        transaction.on_commit(invalidate_findings)
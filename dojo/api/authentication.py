@@ -0,0 +1,39 @@
+"""
+API authentication for Defect Dojo.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from dojo.cache import token_cache_key
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication с кешем соответствия токена пользователю.
+
+    В кеше хранится только id пользователя, а не сам пользователь: хеш
+    пароля и права не попадают в Redis, а учетная запись читается заново
+    по первичному ключу, так что отключенный пользователь сразу теряет
+    доступ. Запрос по первичному ключу заменяет чтение таблицы токенов с
+    JOIN. Запись живет API_TOKEN_CACHE_TTL секунд и удаляется при удалении
+    токена (см. dojo.signals).
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        user_id = cache.get(cache_key)
+        if user_id is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, user.pk, settings.API_TOKEN_CACHE_TTL)
+            return user, token
+
+        user = get_user_model()._default_manager.filter(pk=user_id).first()
+        if user is None or not user.is_active:
+            cache.delete(cache_key)
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        # Токен восстанавливается из ключа без чтения его строки
+        return user, self.get_model()(key=key, user=user)
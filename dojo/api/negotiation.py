@@ -0,0 +1,18 @@
+"""
+API Content Negotiation for Defect Dojo.
+"""
+from rest_framework.negotiation import DefaultContentNegotiation
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """
+    Согласование формата для выгрузок.
+
+    Формат файла задан в URL, а ответ отдается потоком мимо рендереров DRF,
+    поэтому заголовок Accept не проверяется: клиент с ``Accept: text/csv``
+    не должен получать 406. Ошибки и 304 выводятся первым рендерером (JSON).
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        renderer = renderers[0]
+        return renderer, renderer.media_type
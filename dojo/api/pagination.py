@@ -0,0 +1,17 @@
+"""
+API Pagination for Defect Dojo.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class FindingCursorPagination(CursorPagination):
+    """
+    Постраничный вывод находок по курсору.
+
+    Следующая страница выбирается условием по первичному ключу, а не
+    OFFSET, и без COUNT(*), поэтому время ответа не зависит от глубины.
+    """
+    ordering = '-id'
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
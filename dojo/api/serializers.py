@@ -0,0 +1,63 @@
+"""
+API Serializers for Defect Dojo.
+"""
+from rest_framework import serializers
+
+from dojo.importers import PARSER_REGISTRY
+from dojo.models import Finding, Product
+
+
+class FindingSerializer(serializers.ModelSerializer):
+    """
+    Находка вместе с именами продукта и проверки.
+    
+    Параметр ``fields`` оставляет в выводе только перечисленные поля.
+    """
+
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    engagement_name = serializers.CharField(source='engagement.name', read_only=True)
+
+    class Meta:
+        model = Finding
+        fields = [
+            'id', 'title', 'description', 'severity', 'status', 'scanner', 'cwe',
+            'file_path', 'line', 'endpoint', 'fingerprint',
+            'product', 'product_name', 'engagement', 'engagement_name',
+            'created', 'updated',
+        ]
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def columns(cls, fields):
+        """Колонки для ``QuerySet.only()`` и связи для ``select_related()``"""
+        columns, related = [], []
+        for name in fields:
+            declared = cls._declared_fields.get(name)
+            if declared is not None and '.' in declared.source:
+                relation, column = declared.source.split('.', 1)
+                columns.extend((relation, f"{relation}__{column}"))
+                related.append(relation)
+            else:
+                columns.append(name)
+        return columns, related
+
+
+class ImportScanSerializer(serializers.Serializer):
+    """Параметры импорта отчета сканера"""
+
+    file = serializers.FileField()
+    # Без scan_type тип отчета определяется по содержимому
+    scan_type = serializers.ChoiceField(choices=sorted(PARSER_REGISTRY), required=False)
+    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all(), required=False)
+    product_name = serializers.CharField(max_length=255, required=False)
+    engagement_name = serializers.CharField(max_length=255, required=False)
+
+    def validate(self, attrs):
+        if 'product' not in attrs and 'product_name' not in attrs:
+            raise serializers.ValidationError('Either product or product_name is required.')
+        return attrs
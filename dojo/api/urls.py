@@ -1,12 +1,18 @@
 """
 API URLs for Defect Dojo.
 """
+from django.conf import settings
 from django.urls import path, include
 from rest_framework import routers
 from . import views
 
 router = routers.DefaultRouter()
-router.register(r'vulnerabilities', views.VulnerabilityViewSet, basename='vulnerability')
+# Под ASGI (dojo.asgi) - асинхронные действия, под WSGI - обычные синхронные
+router.register(
+    r'vulnerabilities',
+    views.AsyncVulnerabilityViewSet if settings.ASGI else views.VulnerabilityViewSet,
+    basename='vulnerability',
+)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,21 +1,192 @@
 """
 API Views for Defect Dojo.
 """
-from rest_framework import viewsets
+import hashlib
+import uuid
+
+from adrf.viewsets import ViewSet as AsyncViewSet
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+from django.urls import reverse
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.decorators import action
 
-class VulnerabilityViewSet(viewsets.ViewSet):
+from dojo.cache import afindings_list_key, afindings_validator, findings_list_key, findings_validator
+from dojo.exporters import EXPORTERS, export_rows
+from dojo.importers import PARSER_REGISTRY, detect_scan_type
+from dojo.models import Finding, Product
+from .negotiation import ExportContentNegotiation
+from .pagination import FindingCursorPagination
+from .serializers import FindingSerializer, ImportScanSerializer
+
+class VulnerabilityViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for vulnerability management.
+    
+    Продукт и проверка загружаются тем же запросом (select_related), поэтому
+    число запросов на страницу не зависит от числа находок. Фильтры
+    product, severity и status покрываются составным индексом.
+    
+    Страницы выдаются по курсору (``?cursor=``), а ``?fields=id,severity``
+    ограничивает и вывод, и выбираемые из базы колонки. Страницы списка
+    кешируются до любого изменения находок (см. dojo.cache).
+    
+    Список отдает ETag из версии данных, времени последнего изменения и
+    числа находок выборки; при совпадении с If-None-Match ответ 304 без тела.
     """
+    serializer_class = FindingSerializer
+    pagination_class = FindingCursorPagination
+    # Параметр запроса -> поле модели
+    filter_fields = {'product': 'product_id', 'severity': 'severity', 'status': 'status'}
+    # Выгрузки отдаются асинхронным итератором (ASGI)
+    asynchronous = False
+    
+    def requested_fields(self):
+        """Поля из параметра fields (None - все поля)"""
+        value = self.request.query_params.get('fields')
+        if not value:
+            return None
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = set(fields) - set(FindingSerializer.Meta.fields)
+        if unknown:
+            raise ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}"})
+        return fields
+    
+    def requested_filters(self):
+        """Фильтры выборки из параметров запроса"""
+        params = self.request.query_params
+        return {field: params[name] for name, field in self.filter_fields.items() if params.get(name)}
+    
+    def get_queryset(self):
+        fields = self.requested_fields()
+        if fields is None:
+            queryset = Finding.objects.select_related('product', 'engagement')
+        else:
+            columns, related = FindingSerializer.columns(fields)
+            queryset = Finding.objects.select_related(*related).only(*columns)
+        
+        return queryset.filter(**self.requested_filters())
     
-    def list(self, request):
-        """List vulnerabilities."""
+    def etag(self, request, validator):
+        """ETag страницы: валидатор выборки, URL и формат ответа"""
+        version, updated, count = validator
+        representation = f'{version}:{updated}:{count}:{request.get_full_path()}:{request.accepted_renderer.format}'
+        return quote_etag(hashlib.md5(representation.encode()).hexdigest())
+    
+    def list_etag(self, request):
+        return self.etag(request, findings_validator(self.get_queryset(), self.requested_filters()))
+    
+    def not_modified(self, request, etag):
+        return etag in parse_etags(request.headers.get('If-None-Match', ''))
+    
+    def page_data(self, request):
+        """Страница списка без кеша и ETag"""
+        return super().list(request).data
+    
+    def list(self, request, *args, **kwargs):
+        etag = self.list_etag(request)
+        if self.not_modified(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        key = findings_list_key(request)
+        data = cache.get(key)
+        if data is None:
+            data = self.page_data(request)
+            cache.set(key, data, settings.API_LIST_CACHE_TTL)
+        return Response(data, headers={'ETag': etag})
+    
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.requested_fields())
+        return super().get_serializer(*args, **kwargs)
+    
+    @action(detail=False, methods=['get'], url_path=r'export/(?P<export_format>csv|jsonl|xlsx)',
+            content_negotiation_class=ExportContentNegotiation)
+    def export(self, request, export_format=None):
+        """
+        Выгрузка находок в CSV, JSON Lines или XLSX.
+        
+        Принимает те же фильтры и ``fields``, что и список, но без страниц:
+        строки читаются из базы курсором и отдаются потоком. Формат задан
+        в URL, заголовок Accept не влияет на ответ.
+        """
+        etag = self.list_etag(request)
+        if self.not_modified(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        fields = self.requested_fields() or FindingSerializer.Meta.fields
+        rows = export_rows(Finding.objects.filter(**self.requested_filters()), fields)
+        response = EXPORTERS[export_format](fields).response(rows, 'findings', asynchronous=self.asynchronous)
+        response['ETag'] = etag
+        return response
+    
+    @action(detail=False, methods=['post'], url_path='import-scan', parser_classes=[MultiPartParser])
+    def import_scan(self, request):
+        """
+        Импорт отчета сканера (Bandit, Semgrep, ZAP, Nuclei и др.).
+        
+        Запрос только определяет тип отчета, сохраняет файл и ставит задачу
+        в очередь Celery; ответ 202 содержит ссылку на статус импорта.
+        """
+        params = ImportScanSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        upload = data['file']
+        
+        # Нераспознанный отчет отклоняется сразу, а не в воркере
+        scan_type = data.get('scan_type') or detect_scan_type(upload)
+        if scan_type not in PARSER_REGISTRY:
+            raise ValidationError({'file': 'Unknown scan type, pass scan_type explicitly'})
+        
+        product = data.get('product')
+        if product is None:
+            product, _ = Product.objects.get_or_create(name=data['product_name'])
+        
+        upload_dir = settings.IMPORT_UPLOAD_DIR
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        upload_path = upload_dir / f"{uuid.uuid4().hex}.json"
+        with open(upload_path, 'wb') as f:
+            for chunk in upload.chunks():
+                f.write(chunk)
+        
+        # Celery загружается при первом импорте, а не при запуске сервера
+        from dojo.tasks import import_scan_task
+        task = import_scan_task.delay(
+            str(upload_path), product.pk,
+            engagement_name=data.get('engagement_name'),
+            scan_type=scan_type,
+        )
+        status_url = reverse('vulnerability-import-scan-status', kwargs={'task_id': task.id})
         return Response({
-            'message': 'Defect Dojo API is working!',
-            'status': 'success'
-        })
+            'task_id': task.id,
+            'scan_type': scan_type,
+            'product': product.pk,
+            'status_url': request.build_absolute_uri(status_url),
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['get'], url_path=r'import-scan/(?P<task_id>[0-9a-f-]+)')
+    def import_scan_status(self, request, task_id=None):
+        """
+        Статус фонового импорта.
+        
+        PROGRESS содержит число записанных находок и прочитанных байт
+        отчета, SUCCESS - итог импорта, FAILURE - текст ошибки.
+        """
+        from dojo.tasks import import_scan_task
+        task = import_scan_task.AsyncResult(task_id)
+        body = {'task_id': task_id, 'status': task.status}
+        if task.status == 'PROGRESS':
+            body['progress'] = task.info
+        elif task.successful():
+            body['result'] = task.result
+        elif task.failed():
+            body['error'] = str(task.result)
+        return Response(body)
     
     @action(detail=False, methods=['get'])
     def health(self, request):
@@ -23,4 +194,46 @@ class VulnerabilityViewSet(viewsets.ViewSet):
         return Response({
             'status': 'healthy',
             'service': 'Defect Dojo API'
-        }) 
\ No newline at end of file
+        })
+
+
+class AsyncVulnerabilityViewSet(AsyncViewSet, VulnerabilityViewSet):
+    """
+    VulnerabilityViewSet для ASGI.
+    
+    Чтение находки, проверка ETag и кеш списка выполняются асинхронно
+    (асинхронный ORM Django и кеш), так что медленные клиенты и частые
+    проверки здоровья не держат поток. Курсорная пагинация и сериализация
+    страницы, импорт и выгрузки остаются синхронными и выполняются в
+    потоке запроса.
+    """
+    asynchronous = True
+    
+    async def list(self, request, *args, **kwargs):
+        validator = await afindings_validator(self.get_queryset(), self.requested_filters())
+        etag = self.etag(request, validator)
+        if self.not_modified(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        key = await afindings_list_key(request)
+        data = await cache.aget(key)
+        if data is None:
+            data = await sync_to_async(self.page_data)(request)
+            await cache.aset(key, data, settings.API_LIST_CACHE_TTL)
+        return Response(data, headers={'ETag': etag})
+    
+    async def retrieve(self, request, *args, **kwargs):
+        try:
+            finding = await self.get_queryset().aget(pk=kwargs['pk'])
+        except (Finding.DoesNotExist, TypeError, ValueError):
+            raise Http404
+        self.check_object_permissions(request, finding)
+        return Response(self.get_serializer(finding).data)
+    
+    @action(detail=False, methods=['get'])
+    async def health(self, request):
+        """Health check endpoint."""
+        return Response({
+            'status': 'healthy',
+            'service': 'Defect Dojo API'
+        })
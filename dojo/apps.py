@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class DojoConfig(AppConfig):
+    name = 'dojo'
+
+    def ready(self):
+        # Обработчики сигналов сбрасывают кеши при изменении данных
+        from dojo import signals  # noqa: F401
+        # Проверки настроек для manage.py check и migrate
+        from dojo import checks  # noqa: F401
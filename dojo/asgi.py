@@ -0,0 +1,13 @@
+"""
+ASGI config for Defect Dojo project.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dojo.settings')
+# Под ASGI API обслуживается асинхронными действиями (см. dojo.api.urls)
+os.environ.setdefault('DOJO_ASGI', 'True')
+
+application = get_asgi_application()
@@ -0,0 +1,100 @@
+"""
+Cache helpers for Defect Dojo.
+
+Ответы списка находок кешируются под ключом с версией набора данных:
+любая запись находки, продукта или проверки меняет версию, и старые
+ответы просто перестают читаться, дожидаясь истечения TTL. Валидаторы
+выборок для ETag хранятся под той же версией и включают ее: переименование
+продукта или проверки не меняет находки, но меняет ETag.
+
+Функции с префиксом ``a`` - асинхронные варианты для действий API под ASGI.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+FINDINGS_VERSION_KEY = 'findings:version'
+
+# Время последнего изменения и число находок выборки одним запросом
+VALIDATOR_AGGREGATES = {'updated': Max('updated'), 'count': Count('id')}
+
+
+def findings_version():
+    """Текущая версия данных о находках"""
+    version = cache.get(FINDINGS_VERSION_KEY)
+    if version is None:
+        # add не перезапишет версию, выставленную параллельным запросом
+        cache.add(FINDINGS_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(FINDINGS_VERSION_KEY)
+    return version
+
+
+async def afindings_version():
+    version = await cache.aget(FINDINGS_VERSION_KEY)
+    if version is None:
+        await cache.aadd(FINDINGS_VERSION_KEY, uuid.uuid4().hex, None)
+        version = await cache.aget(FINDINGS_VERSION_KEY)
+    return version
+
+
+def invalidate_findings():
+    """Делает недействительными все закешированные списки находок"""
+    cache.set(FINDINGS_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def list_key(version, request):
+    digest = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'findings:list:{version}:{digest}'
+
+
+def findings_list_key(request):
+    """Ключ ответа списка: версия данных и полный URL запроса"""
+    return list_key(findings_version(), request)
+
+
+async def afindings_list_key(request):
+    return list_key(await afindings_version(), request)
+
+
+def validator_key(version, params):
+    digest = hashlib.md5(repr(sorted(params.items())).encode()).hexdigest()
+    return f'findings:validator:{version}:{digest}'
+
+
+def as_validator(version, stats):
+    return (version, stats['updated'].isoformat() if stats['updated'] else '', stats['count'])
+
+
+def findings_validator(queryset, params):
+    """
+    Версия данных, время последнего изменения и число находок выборки.
+
+    Считается одним агрегатным запросом и хранится в кеше до смены версии
+    данных, но не дольше API_LIST_CACHE_TTL; ``params`` - значения
+    фильтров, определяющих выборку.
+    """
+    version = findings_version()
+    key = validator_key(version, params)
+    validator = cache.get(key)
+    if validator is None:
+        validator = as_validator(version, queryset.order_by().aggregate(**VALIDATOR_AGGREGATES))
+        cache.set(key, validator, settings.API_LIST_CACHE_TTL)
+    return validator
+
+
+async def afindings_validator(queryset, params):
+    version = await afindings_version()
+    key = validator_key(version, params)
+    validator = await cache.aget(key)
+    if validator is None:
+        validator = as_validator(version, await queryset.order_by().aaggregate(**VALIDATOR_AGGREGATES))
+        await cache.aset(key, validator, settings.API_LIST_CACHE_TTL)
+    return validator
+
+
+def token_cache_key(key):
+    """Ключ пользователя по API-токену; сам токен в Redis не попадает"""
+    return 'api-token:' + hashlib.sha256(key.encode()).hexdigest()
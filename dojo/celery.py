@@ -0,0 +1,15 @@
+"""
+Celery application for Defect Dojo.
+
+Настройки берутся из Django settings с префиксом CELERY_, задачи ищутся
+в tasks.py приложений.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dojo.settings')
+
+app = Celery('dojo')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,73 @@
+"""
+System checks for Defect Dojo settings.
+
+Проверки выполняются при каждой команде manage.py, в том числе migrate
+в docker-entrypoint.sh, поэтому ошибочная конфигурация останавливает
+контейнер до запуска сервера.
+"""
+import os
+from collections import Counter
+
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+from dojo.cpu import gunicorn_workers
+
+POOLERS = ('', 'pgbouncer')
+
+
+@register()
+def check_database_connections(app_configs, **kwargs):
+    messages = []
+    engine = settings.DATABASES['default']['ENGINE']
+
+    if settings.DB_CONN_MAX_AGE < 0:
+        messages.append(Error(
+            f"DB_CONN_MAX_AGE={settings.DB_CONN_MAX_AGE}: ожидается число секунд >= 0",
+            id='dojo.E001',
+        ))
+    if settings.DB_POOLER not in POOLERS:
+        messages.append(Error(
+            f"DB_POOLER={settings.DB_POOLER!r}: неизвестный пулер",
+            hint="Допустимо пустое значение или 'pgbouncer'",
+            id='dojo.E002',
+        ))
+    elif settings.DB_POOLER and engine != 'django.db.backends.postgresql':
+        messages.append(Error(
+            f"DB_POOLER={settings.DB_POOLER!r} работает только с PostgreSQL",
+            id='dojo.E003',
+        ))
+
+    if settings.ASGI and settings.DB_CONN_MAX_AGE and not settings.DB_POOLER:
+        # Под ASGI синхронный код каждого запроса идет в своем потоке,
+        # и постоянное соединение этого потока больше не используется
+        messages.append(Warning(
+            "Постоянные соединения под ASGI не переиспользуются между запросами",
+            hint="Задайте DB_CONN_MAX_AGE=0 или DB_POOLER=pgbouncer",
+            id='dojo.W001',
+        ))
+
+    if engine == 'django.db.backends.postgresql' and settings.DB_CONN_MAX_AGE and not settings.DB_POOLER:
+        # Каждый поток web держит свое соединение
+        workers = gunicorn_workers()
+        threads = int(os.environ.get('GUNICORN_THREADS', 4))
+        if workers * threads > settings.DB_MAX_CONNECTIONS:
+            messages.append(Warning(
+                f"{workers} воркеров x {threads} потоков держат до {workers * threads} соединений, "
+                f"больше DB_MAX_CONNECTIONS={settings.DB_MAX_CONNECTIONS}",
+                hint="Уменьшите GUNICORN_WORKERS/GUNICORN_THREADS или включите DB_POOLER=pgbouncer",
+                id='dojo.W002',
+            ))
+    return messages
+
+
+@register()
+def check_middleware(app_configs, **kwargs):
+    duplicates = [path for path, count in Counter(settings.MIDDLEWARE).items() if count > 1]
+    return [
+        Warning(
+            f"{path} подключен в MIDDLEWARE несколько раз и выполняется на каждый запрос повторно",
+            id='dojo.W003',
+        )
+        for path in duplicates
+    ]
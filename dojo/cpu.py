@@ -0,0 +1,65 @@
+"""
+CPU limits of the container for Defect Dojo.
+
+``os.cpu_count()`` возвращает число ядер хоста, а не доступных процессу:
+контейнер с ``--cpus=2`` на 64-ядерной машине получил бы 129 воркеров.
+Здесь учитываются привязка процесса к ядрам (cpuset) и квота CFS cgroup.
+Модуль не импортирует Django и читается из gunicorn.conf.py.
+"""
+import math
+import os
+
+# cgroup v2: "<квота> <период>" или "max <период>"
+CGROUP_V2_CPU_MAX = '/sys/fs/cgroup/cpu.max'
+# cgroup v1: квота -1 - без ограничения
+CGROUP_V1_QUOTA = '/sys/fs/cgroup/cpu/cpu.cfs_quota_us'
+CGROUP_V1_PERIOD = '/sys/fs/cgroup/cpu/cpu.cfs_period_us'
+
+# Предел воркеров по умолчанию (см. расчет соединений у DB_CONN_MAX_AGE)
+MAX_DEFAULT_WORKERS = 8
+
+
+def read_first_line(path):
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_quota():
+    """Квота CPU cgroup в ядрах (None - без ограничения)"""
+    line = read_first_line(CGROUP_V2_CPU_MAX)
+    if line:
+        quota, _, period = line.partition(' ')
+    else:
+        quota, period = read_first_line(CGROUP_V1_QUOTA), read_first_line(CGROUP_V1_PERIOD)
+    try:
+        quota, period = int(quota), int(period)
+    except (TypeError, ValueError):
+        # "max" или файлы cgroup недоступны
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return max(1, math.ceil(quota / period))
+
+
+def available_cpus():
+    """Ядра, доступные процессу: привязка к ядрам с учетом квоты cgroup"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # macOS: привязки к ядрам нет
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota()
+    return min(cpus, quota) if quota else cpus
+
+
+def default_workers():
+    """Число воркеров gunicorn по умолчанию: 2 x ядра + 1, не больше предела"""
+    return min(available_cpus() * 2 + 1, MAX_DEFAULT_WORKERS)
+
+
+def gunicorn_workers():
+    """GUNICORN_WORKERS или значение по умолчанию"""
+    return int(os.environ.get('GUNICORN_WORKERS') or default_workers())
@@ -0,0 +1,195 @@
+"""
+Finding exporters for Defect Dojo.
+
+Строки читаются через ``QuerySet.iterator()`` (серверный курсор на
+PostgreSQL) кортежами ``values_list`` без создания моделей и
+сериализуются пачками по EXPORT_CHUNK_SIZE, поэтому память воркера не
+зависит от размера выгрузки. CSV и JSON Lines отдаются по мере чтения,
+XLSX собирается во временный файл в режиме constant_memory.
+
+Под ASGI фрагменты отдаются асинхронным итератором, который читает
+каждый из них в потоке запроса: синхронный итератор Django под ASGI
+сначала вычитал бы ответ целиком.
+"""
+import csv
+import io
+import tempfile
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.http import StreamingHttpResponse
+
+# Поле сериализатора -> выражение для values_list
+COLUMN_LOOKUPS = {
+    'product': 'product_id',
+    'product_name': 'product__name',
+    'engagement': 'engagement_id',
+    'engagement_name': 'engagement__name',
+}
+
+# Excel выполняет ячейки, начинающиеся с этих символов, как формулы
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Строк на листе XLSX, считая заголовок
+XLSX_MAX_ROWS = 1048576
+# Размер блока при отдаче собранного XLSX
+XLSX_BLOCK_SIZE = 64 * 1024
+
+
+def export_rows(queryset, fields):
+    """Кортежи значений ``fields`` в порядке id, читаемые курсором"""
+    lookups = [COLUMN_LOOKUPS.get(name, name) for name in fields]
+    queryset = queryset.order_by('id')
+    if connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        return keyset_rows(queryset, lookups)
+    return queryset.values_list(*lookups).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def keyset_rows(queryset, lookups):
+    """
+    Те же строки запросами по диапазону id.
+
+    Без серверных курсоров (pgbouncer в режиме transaction) psycopg2
+    получил бы всю выборку разом, поэтому строки читаются страницами
+    ``id > последний``, каждая отдельным запросом по первичному ключу.
+    """
+    last_id = None
+    while True:
+        page = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        rows = list(page.values_list('id', *lookups)[:settings.EXPORT_CHUNK_SIZE])
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        for row in rows:
+            yield row[1:]
+
+
+def batches(rows):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, settings.EXPORT_CHUNK_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+async def aiterate(chunks):
+    """Синхронный генератор фрагментов как асинхронный итератор"""
+    chunks = iter(chunks)
+    # Поток запроса: курсор базы открыт в нем же
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await next_chunk(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class Exporter:
+    """Базовый экспорт: потоковый ответ из фрагментов ``chunks``"""
+
+    content_type = None
+    extension = None
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def chunks(self, rows):
+        raise NotImplementedError
+
+    def response(self, rows, filename, asynchronous=False):
+        chunks = self.chunks(rows)
+        if asynchronous:
+            chunks = aiterate(chunks)
+        response = StreamingHttpResponse(chunks, content_type=self.content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{self.extension}"'
+        return response
+
+
+class CsvExporter(Exporter):
+    content_type = 'text/csv; charset=utf-8'
+    extension = 'csv'
+
+    @staticmethod
+    def escape(value):
+        # Защита от CSV injection: текст из отчета сканера не станет формулой
+        if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+            return "'" + value
+        return value
+
+    def chunks(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.fields)
+        for batch in batches(rows):
+            writer.writerows([self.escape(value) for value in row] for row in batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+
+class JsonLinesExporter(Exporter):
+    content_type = 'application/x-ndjson'
+    extension = 'jsonl'
+
+    def chunks(self, rows):
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        for batch in batches(rows):
+            yield ''.join(encoder.encode(dict(zip(self.fields, row))) + '\n' for row in batch)
+
+
+class XlsxExporter(Exporter):
+    """
+    XLSX через xlsxwriter в режиме constant_memory.
+
+    Строки сбрасываются на диск по одной, но zip-архив книги собирается
+    только при закрытии, поэтому отдача начинается после записи всех
+    строк (при чтении первого фрагмента ответа). Сверх лимита строк Excel
+    данные продолжаются на новом листе.
+    """
+
+    content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    extension = 'xlsx'
+
+    def chunks(self, rows):
+        with tempfile.TemporaryFile() as output:
+            self.write_workbook(output, rows)
+            output.seek(0)
+            yield from iter(lambda: output.read(XLSX_BLOCK_SIZE), b'')
+
+    def write_workbook(self, output, rows):
+        # Библиотека нужна только этому экспорту и не загружается при запуске
+        import xlsxwriter
+
+        workbook = xlsxwriter.Workbook(output, {
+            'constant_memory': True,
+            'tmpdir': tempfile.gettempdir(),
+            # Текст пишется как есть: ни формул, ни ссылок (лимит 65530 на лист)
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+            'remove_timezone': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        })
+        worksheet, row_number = None, XLSX_MAX_ROWS
+        for batch in batches(rows):
+            for row in batch:
+                if row_number == XLSX_MAX_ROWS:
+                    worksheet = workbook.add_worksheet()
+                    worksheet.write_row(0, 0, self.fields)
+                    row_number = 1
+                worksheet.write_row(row_number, 0, row)
+                row_number += 1
+        if worksheet is None:
+            workbook.add_worksheet().write_row(0, 0, self.fields)
+        workbook.close()
+
+
+EXPORTERS = {
+    'csv': CsvExporter,
+    'jsonl': JsonLinesExporter,
+    'xlsx': XlsxExporter,
+}
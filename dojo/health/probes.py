@@ -0,0 +1,166 @@
+"""
+Dependency probes for Defect Dojo.
+
+Проверки базы и Redis используются командой wait_for_db при запуске
+контейнера и ``/health/ready`` во время работы. Готовность проверяется
+параллельно, у каждой зависимости свой поток и свой таймаут, а результат
+хранится HEALTH_READY_TTL секунд: частые запросы балансировщика из всех
+воркеров nginx доходят до базы не чаще раза за TTL на процесс.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.db import connections
+from django.db.utils import OperationalError
+
+
+class ServiceProbe:
+    """Проверка доступности одного сервиса: базы по алиасу или Redis по URL"""
+
+    # Ошибки, после которых ждать бессмысленно (например, неверный пароль Redis)
+    fatal_errors = ()
+
+    def __init__(self, name, key):
+        self.name = name
+        # Имя проверки в ответе /health/ready
+        self.key = key
+
+    def check(self):
+        raise NotImplementedError
+
+
+class DatabaseProbe(ServiceProbe):
+    retry_errors = (OperationalError,)
+
+    def __init__(self, alias, persistent=False):
+        super().__init__(f'database "{alias}"', f'database:{alias}')
+        self.alias = alias
+        self.persistent = persistent
+
+    def check(self):
+        # Соединения потоковые: проверка идет в своем потоке
+        connection = connections[self.alias]
+        if not self.persistent:
+            try:
+                connection.ensure_connection()
+            finally:
+                connection.close()
+            return
+        # Постоянное соединение потока проверки; SELECT 1 доходит до сервера и через pgbouncer
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Exception:
+            connection.close()
+            raise
+
+
+class RedisProbe(ServiceProbe):
+    def __init__(self, role, url, timeout):
+        import redis
+
+        # Пароль из URL в вывод не попадает
+        parts = urlsplit(url)
+        super().__init__(f'{role} redis "{parts.hostname}:{parts.port or 6379}{parts.path}"', role)
+        self.client = redis.Redis.from_url(url, socket_connect_timeout=timeout, socket_timeout=timeout)
+        self.retry_errors = (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)
+        self.fatal_errors = (redis.exceptions.AuthenticationError, redis.exceptions.ResponseError)
+
+    def check(self):
+        self.client.ping()
+
+
+def dependency_probes(timeout, redis=True, persistent=False):
+    """
+    Проверки всех баз из DATABASES, Redis кеша и брокера Celery.
+
+    Redis проверяется, только если он настроен: кеш - при бэкенде Redis,
+    брокер - при Redis URL и без CELERY_TASK_ALWAYS_EAGER. Запуск без
+    Redis (SQLite, locmem, eager) ждет одну базу.
+    """
+    probes = [DatabaseProbe(alias, persistent) for alias in settings.DATABASES]
+    if redis:
+        if isinstance(caches['default'], RedisCache):
+            probes.append(RedisProbe('cache', settings.CACHES['default']['LOCATION'], timeout))
+        broker = settings.CELERY_BROKER_URL or ''
+        if broker.startswith(('redis://', 'rediss://')) and not settings.CELERY_TASK_ALWAYS_EAGER:
+            probes.append(RedisProbe('broker', broker, timeout))
+    return probes
+
+
+class Readiness:
+    """
+    Готовность зависимостей с кешем результата.
+
+    У каждой проверки один поток: соединение с базой живет в нем между
+    проверками, а зависшая проверка не запускается повторно, пока не
+    завершится, и число потоков не растет.
+    """
+
+    def __init__(self, probes, timeout, ttl):
+        self.probes = probes
+        self.timeout = timeout
+        self.ttl = ttl
+        self.executors = {
+            probe.key: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'health-{probe.key}')
+            for probe in probes
+        }
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.result = None
+        self.expires = 0
+
+    def timed_check(self, probe):
+        started = time.monotonic()
+        try:
+            probe.check()
+        except Exception as e:
+            return {'status': 'error', 'error': type(e).__name__,
+                    'seconds': round(time.monotonic() - started, 4)}
+        return {'status': 'ok', 'seconds': round(time.monotonic() - started, 4)}
+
+    def run(self):
+        futures = {}
+        for probe in self.probes:
+            future = self.pending.get(probe.key)
+            if future is None or future.done():
+                future = self.pending[probe.key] = self.executors[probe.key].submit(self.timed_check, probe)
+            futures[probe.key] = future
+        done, _ = wait(futures.values(), timeout=self.timeout)
+        checks = {
+            key: future.result() if future in done else {'status': 'timeout'}
+            for key, future in futures.items()
+        }
+        return all(check['status'] == 'ok' for check in checks.values()), checks
+
+    def status(self):
+        """(готов ли сервис, результаты проверок), не чаще раза за TTL"""
+        if time.monotonic() < self.expires:
+            return self.result
+        # Пока один поток проверяет зависимости, остальные ждут его результат
+        with self.lock:
+            if time.monotonic() >= self.expires:
+                self.result = self.run()
+                self.expires = time.monotonic() + self.ttl
+        return self.result
+
+
+_readiness = None
+_readiness_lock = threading.Lock()
+
+
+def readiness():
+    global _readiness
+    if _readiness is None:
+        with _readiness_lock:
+            if _readiness is None:
+                timeout = settings.HEALTH_PROBE_TIMEOUT
+                _readiness = Readiness(
+                    dependency_probes(timeout, persistent=True), timeout, settings.HEALTH_READY_TTL
+                )
+    return _readiness
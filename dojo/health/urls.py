@@ -1,9 +1,16 @@
 """
 Health check URLs for Defect Dojo.
 """
+from django.conf import settings
 from django.urls import path
 from . import views
- 
+
+# Под ASGI (dojo.asgi) - асинхронные представления, под WSGI - обычные синхронные
+live = views.async_live if settings.ASGI else views.live
+ready = views.async_ready if settings.ASGI else views.ready
+
 urlpatterns = [
-    path('', views.health_check, name='health_check'),
-] 
\ No newline at end of file
+    path('', live, name='health'),
+    path('live', live, name='health_live'),
+    path('ready', ready, name='health_ready'),
+]
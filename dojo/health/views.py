@@ -1,14 +1,60 @@
 """
-Health check views for Defect Dojo.
+Health check and metrics views for Defect Dojo.
 """
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-
-@csrf_exempt
-def health_check(request):
-    """Health check endpoint."""
-    return JsonResponse({
-        'status': 'healthy',
-        'service': 'Defect Dojo',
-        'version': '1.0.0'
-    }) 
\ No newline at end of file
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.crypto import constant_time_compare
+
+from dojo import metrics as request_metrics
+from dojo.health.probes import readiness
+
+
+# Под WSGI асинхронное представление выполняется через async_to_sync с новым
+# циклом событий на запрос, под ASGI синхронное - в отдельном потоке, поэтому
+# urls выбирает вариант по DOJO_ASGI
+LIVENESS = {
+    'status': 'healthy',
+    'service': 'Defect Dojo DevSecOps',
+    'version': '1.0.0'
+}
+
+
+def live(request):
+    """Liveness: процесс отвечает на запросы; без обращений к базе и Redis"""
+    return JsonResponse(LIVENESS)
+
+
+async def async_live(request):
+    """Liveness для ASGI"""
+    return JsonResponse(LIVENESS)
+
+
+def readiness_response(is_ready, checks):
+    return JsonResponse(
+        {'status': 'ready' if is_ready else 'unavailable', 'checks': checks},
+        status=200 if is_ready else 503,
+    )
+
+
+def ready(request):
+    """Readiness: база, кеш и брокер доступны; 503, если хотя бы одна проверка не прошла"""
+    return readiness_response(*readiness().status())
+
+
+async def async_ready(request):
+    """Readiness для ASGI"""
+    # Проверки блокирующие и не должны занимать общий поток sync-кода
+    is_ready, checks = await sync_to_async(readiness().status, thread_sensitive=False)()
+    return readiness_response(is_ready, checks)
+
+
+def metrics(request):
+    """Метрики запросов в текстовом формате Prometheus"""
+    token = settings.METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        request_metrics.render(request_metrics.snapshot()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
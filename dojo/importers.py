@@ -0,0 +1,140 @@
+"""
+Import of scanner reports into Defect Dojo.
+
+Отчеты разбираются теми же парсерами, что и в Security Gateway
+(scripts/gateway_parsers.py): файл читается потоково, а находки пишутся
+пачками через ``bulk_create`` с обновлением уже известных по отпечатку.
+"""
+import contextlib
+import io
+import sys
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from dojo.cache import invalidate_findings
+from dojo.models import Engagement, Finding
+
+# Модули Security Gateway лежат в scripts/ и импортируют друг друга по имени
+SCRIPTS_DIR = str(settings.BASE_DIR / 'scripts')
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+
+from gateway_discovery import sniff_stream  # noqa: E402
+from gateway_parsers import PARSER_REGISTRY  # noqa: E402
+
+# Уровни в порядке кодов парсеров (CRITICAL, HIGH, MEDIUM, LOW)
+SEVERITIES = (
+    Finding.SEVERITY_CRITICAL,
+    Finding.SEVERITY_HIGH,
+    Finding.SEVERITY_MEDIUM,
+    Finding.SEVERITY_LOW,
+)
+
+# Поля, которые повторный импорт обновляет; статус разбора остается прежним
+UPDATE_FIELDS = ['engagement', 'title', 'description', 'severity', 'scanner', 'cwe',
+                 'file_path', 'line', 'endpoint', 'updated']
+
+
+class ScanImportError(ValueError):
+    """Отчет не распознан или не может быть разобран"""
+
+
+def open_report(upload):
+    """Текстовый поток поверх загруженного файла без чтения его целиком"""
+    upload.seek(0)
+    return io.TextIOWrapper(upload.file, encoding='utf-8')
+
+
+def detect_scan_type(upload):
+    stream = open_report(upload)
+    try:
+        return sniff_stream(stream)
+    finally:
+        stream.detach()
+
+
+def import_scan(upload, product, engagement_name=None, scan_type=None, batch_size=None,
+                atomic=True, progress=None):
+    """
+    Импортирует отчет сканера в продукт ``product``.
+
+    Возвращает тип отчета, проверку и число импортированных и повторных
+    находок. При ``atomic`` все пачки пишутся в одной транзакции: ошибка
+    разбора в середине файла не оставляет импорт наполовину выполненным.
+    Без нее каждая пачка фиксируется сразу, и ход импорта виден снаружи;
+    повторный запуск безопасен, так как запись идет с обновлением по
+    отпечатку. ``progress`` вызывается после каждой пачки.
+    """
+    scan_type = scan_type or detect_scan_type(upload)
+    if scan_type not in PARSER_REGISTRY:
+        raise ScanImportError(f"Unknown scan type: {scan_type}")
+    parser = PARSER_REGISTRY[scan_type](getattr(upload, 'name', scan_type))
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    size = upload.size
+
+    imported = duplicates = 0
+    seen = set()
+    stream = open_report(upload)
+    try:
+        with transaction.atomic() if atomic else contextlib.nullcontext():
+            engagement, _ = Engagement.objects.get_or_create(
+                product=product, name=engagement_name or f"{parser.title} import"
+            )
+            findings = parser.findings(stream)
+            while True:
+                chunk = list(islice(findings, batch_size))
+                if not chunk:
+                    break
+                batch = []
+                for finding in chunk:
+                    # Одна находка дважды в пачке сломала бы ON CONFLICT DO UPDATE
+                    if finding['fingerprint'] in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(finding['fingerprint'])
+                    batch.append(Finding(
+                        product=product,
+                        engagement=engagement,
+                        scanner=scan_type,
+                        title=finding['title'][:511],
+                        description=finding.get('description') or '',
+                        severity=SEVERITIES[finding['severity']],
+                        cwe=finding.get('cwe'),
+                        file_path=(finding.get('file_path') or '')[:1024],
+                        line=finding.get('line'),
+                        endpoint=(finding.get('endpoint') or '')[:2048],
+                        fingerprint=f"{finding['fingerprint']:016x}",
+                    ))
+                # Внутри общей транзакции savepoint на пачку не нужен
+                with transaction.atomic(savepoint=False):
+                    Finding.objects.bulk_create(
+                        batch,
+                        update_conflicts=True,
+                        unique_fields=['product', 'fingerprint'],
+                        update_fields=UPDATE_FIELDS,
+                    )
+                    # bulk_create не шлет сигналов, поэтому кеш списков сбрасывается
+                    # явно: после каждой пачки или один раз после общей транзакции
+                    if not atomic or imported == 0:
+                        transaction.on_commit(invalidate_findings)
+                imported += len(batch)
+                if progress is not None:
+                    progress({
+                        'imported': imported,
+                        'duplicates': duplicates,
+                        'bytes_read': upload.file.tell(),
+                        'bytes_total': size,
+                    })
+    except ValueError as e:
+        raise ScanImportError(f"Invalid {parser.title} report: {e}") from e
+    finally:
+        stream.detach()
+
+    return {
+        'scan_type': scan_type,
+        'engagement': engagement.pk,
+        'imported': imported,
+        'duplicates': duplicates,
+    }
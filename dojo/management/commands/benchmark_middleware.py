@@ -0,0 +1,91 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse, HttpResponseForbidden
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.security import SecurityMiddleware as DjangoSecurityMiddleware
+from django.test import RequestFactory
+
+from dojo.middleware import SecurityMiddleware
+
+PATHS = ('/api/vulnerabilities/', '/admin/login/', '/health/', '/')
+
+
+class LegacySecurityMiddleware:
+    """dojo.middleware.SecurityMiddleware до предварительной сборки политики и заголовков"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path.startswith('/admin/'):
+            if request.method not in ['GET', 'POST']:
+                return HttpResponseForbidden("Method not allowed")
+        if request.path.startswith('/api/'):
+            if request.method not in ['GET', 'POST', 'PUT', 'DELETE']:
+                return HttpResponseForbidden("Method not allowed")
+
+        response = self.get_response(request)
+        response['X-Content-Type-Options'] = 'nosniff'
+        response['X-Frame-Options'] = 'DENY'
+        response['X-XSS-Protection'] = '1; mode=block'
+        response['Referrer-Policy'] = 'strict-origin-when-cross-origin'
+        response['Cross-Origin-Opener-Policy'] = 'same-origin'
+        response['Cross-Origin-Embedder-Policy'] = 'require-corp'
+        return response
+
+
+def build_chain(middleware):
+    """Цепочка как в MIDDLEWARE: middleware Django снаружи, проверяемая - ближе всего к view"""
+    handler = middleware(lambda request: HttpResponse())
+    for outer in (XFrameOptionsMiddleware, DjangoSecurityMiddleware):
+        handler = outer(handler)
+    return handler
+
+
+class Command(BaseCommand):
+    """Django command to measure per-request overhead of dojo.middleware.SecurityMiddleware"""
+
+    help = 'Times the security middleware chain for typical paths, before and after precompilation'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--number',
+            type=int,
+            default=20000,
+            help='Requests per timing (default: 20000)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timings per case, the best one is reported (default: 5)'
+        )
+
+    def time_us(self, handler, request, number, repeat):
+        best = min(timeit.repeat(lambda: handler(request), number=number, repeat=repeat))
+        return best / number * 1e6
+
+    def handle(self, *args, **options):
+        number, repeat = options['number'], options['repeat']
+        factory = RequestFactory()
+        bare = lambda request: HttpResponse()  # noqa: E731
+        legacy, current = build_chain(LegacySecurityMiddleware), build_chain(SecurityMiddleware)
+
+        self.stdout.write(f"{'path':<24} {'response, us':>13} {'legacy, us':>11} {'current, us':>12} {'overhead cut':>13}")
+        for path in PATHS:
+            request = factory.get(path)
+            base_us = self.time_us(bare, request, number, repeat)
+            legacy_us = self.time_us(legacy, request, number, repeat)
+            current_us = self.time_us(current, request, number, repeat)
+            # Доля накладных расходов цепочки сверх создания самого ответа
+            cut = 1 - (current_us - base_us) / (legacy_us - base_us)
+            self.stdout.write(
+                f'{path:<24} {base_us:>13.2f} {legacy_us:>11.2f} {current_us:>12.2f} {cut:>12.0%}'
+            )
+
+        request = factory.generic('PATCH', '/api/vulnerabilities/')
+        self.stdout.write(
+            f"{'PATCH /api/ (403)':<24} {'':>13} {self.time_us(legacy, request, number, repeat):>11.2f} "
+            f"{self.time_us(current, request, number, repeat):>12.2f}"
+        )
@@ -0,0 +1,89 @@
+import time
+from urllib.parse import parse_qs, urlsplit
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.pagination import Cursor, PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from dojo.api.pagination import FindingCursorPagination
+from dojo.api.serializers import FindingSerializer
+from dojo.models import Engagement, Finding, Product
+
+URL = '/api/vulnerabilities/'
+
+
+class Command(BaseCommand):
+    """Django command to compare page latency of offset and cursor pagination by depth"""
+
+    help = 'Seeds findings in a rolled back transaction and times pages at increasing depth'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--findings',
+            type=int,
+            default=100000,
+            help='Number of synthetic findings (default: 100000)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timings per page, the best one is reported (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['findings'])
+            self.compare(options['findings'], options['repeat'])
+            # Синтетические данные не должны остаться в базе
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        self.stdout.write(f'Seeding {count} findings...')
+        product = Product.objects.create(name='benchmark-pagination')
+        engagement = Engagement.objects.create(product=product, name='benchmark')
+        Finding.objects.bulk_create(
+            (Finding(product=product, engagement=engagement, title=f'Finding {i}',
+                     severity=Finding.SEVERITY_HIGH, scanner='benchmark', fingerprint=f'{i:016x}')
+             for i in range(count)),
+            batch_size=5000
+        )
+
+    def time_page(self, paginator, params, repeat):
+        factory = APIRequestFactory()
+        queryset = Finding.objects.select_related('product', 'engagement')
+        best = None
+        for _ in range(repeat):
+            request = Request(factory.get(URL, params))
+            start = time.perf_counter()
+            page = paginator.paginate_queryset(queryset, request)
+            FindingSerializer(page, many=True).data
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000
+
+    def compare(self, count, repeat):
+        page_size = FindingCursorPagination.page_size
+        offset_paginator = PageNumberPagination()
+        offset_paginator.page_size = page_size
+        cursor_paginator = FindingCursorPagination()
+
+        ids = list(Finding.objects.order_by('-id').values_list('id', flat=True))
+        pages = count // page_size
+        depths = sorted({1, 10, 100, 1000, 10000, pages} & set(range(1, pages + 1)))
+
+        self.stdout.write(f"{'page':>8} {'offset, ms':>11} {'cursor, ms':>11}")
+        for depth in depths:
+            offset_ms = self.time_page(offset_paginator, {'page': depth}, repeat)
+
+            # Курсор на ту же страницу: позиция - последний id предыдущей страницы
+            params = {}
+            if depth > 1:
+                cursor_paginator.base_url = URL
+                position = ids[(depth - 1) * page_size - 1]
+                cursor_url = cursor_paginator.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+                params = {'cursor': parse_qs(urlsplit(cursor_url).query)['cursor'][0]}
+            cursor_ms = self.time_page(cursor_paginator, params, repeat)
+
+            self.stdout.write(f'{depth:>8} {offset_ms:>11.2f} {cursor_ms:>11.2f}')
@@ -0,0 +1,100 @@
+import json
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+
+# Метка сборки в STATIC_ROOT: файлы собраны тем же образом
+STATIC_MARKER = '.build-stamp'
+
+
+class Command(BaseCommand):
+    """
+    Django command to prepare a container for serving in a single process.
+
+    При сборке образа (``--build``) собирает статику и записывает метку:
+    список миграций на диске и идентификатор собранной статики. При
+    запуске ждет базу и Redis, а migrate и collectstatic выполняет, только
+    если метка показывает, что база отстает от миграций образа или STATIC_ROOT
+    собран не этим образом. Без метки (запуск вне образа) выполняется все.
+    """
+
+    help = 'Waits for services, then migrates and collects static files only when the build stamp requires it'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--build',
+            action='store_true',
+            help='Collect static files and write the build stamp (Dockerfile)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Always run migrate and collectstatic'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30,
+            help='Timeout in seconds for waiting on services (default: 30)'
+        )
+        parser.add_argument(
+            '--test-superuser',
+            action='store_true',
+            help='Create the admin/admin123 superuser for test deployments'
+        )
+
+    def handle(self, *args, **options):
+        stamp_file = Path(settings.STARTUP_STAMP_FILE)
+        if options['build']:
+            self.build(stamp_file)
+            return
+
+        call_command('wait_for_db', timeout=options['timeout'], stdout=self.stdout, stderr=self.stderr)
+        stamp = None
+        if stamp_file.exists() and not options['force']:
+            stamp = json.loads(stamp_file.read_text())
+        self.migrate(stamp)
+        if options['test_superuser']:
+            self.create_test_superuser()
+        self.collectstatic(stamp)
+
+    def build(self, stamp_file):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        static_id = uuid.uuid4().hex
+        Path(settings.STATIC_ROOT, STATIC_MARKER).write_text(static_id)
+        # Миграции читаются с диска, без соединения с базой
+        migrations = sorted(MigrationLoader(None, ignore_no_migrations=True).disk_migrations)
+        stamp_file.write_text(json.dumps({'migrations': migrations, 'static': static_id}))
+        self.stdout.write(self.style.SUCCESS(f'Build stamp written: {len(migrations)} migrations, static {static_id}'))
+
+    def migrate(self, stamp):
+        if stamp is not None:
+            applied = MigrationRecorder(connections[DEFAULT_DB_ALIAS]).applied_migrations()
+            if not {tuple(migration) for migration in stamp['migrations']} - set(applied):
+                self.stdout.write('Migrations of this build are applied, skipping migrate')
+                return
+        call_command('migrate', interactive=False, stdout=self.stdout)
+
+    def collectstatic(self, stamp):
+        marker = Path(settings.STATIC_ROOT, STATIC_MARKER)
+        if stamp is not None and marker.exists() and marker.read_text() == stamp['static']:
+            self.stdout.write('Static files of this build are collected, skipping collectstatic')
+            return
+        call_command('collectstatic', interactive=False, verbosity=0)
+        # STATIC_ROOT на томе: следующий запуск того же образа пропустит collectstatic
+        if stamp is not None:
+            marker.write_text(stamp['static'])
+
+    def create_test_superuser(self):
+        if User.objects.filter(username='admin').exists():
+            self.stdout.write('Superuser already exists')
+        else:
+            User.objects.create_superuser('admin', 'admin@test.com', 'admin123')
+            self.stdout.write('Superuser created: admin/admin123')
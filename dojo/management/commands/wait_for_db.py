@@ -1,41 +1,114 @@
+import random
+import threading
 import time
-from django.db import connections
-from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dojo.health.probes import dependency_probes
 
 
 class Command(BaseCommand):
-    """Django command to pause execution until database is available"""
+    """
+    Django command to pause execution until the database and Redis are available.
+
+    Все базы из DATABASES и Redis (кеш и брокер Celery) проверяются
+    параллельно. Повторы идут с экспоненциальной задержкой и jitter, первая
+    меньше 0.1 с, поэтому готовность фиксируется почти сразу после запуска
+    сервиса. По таймауту команда завершается с ненулевым кодом.
+    """
+
+    help = 'Waits for all configured databases and Redis with exponential backoff'
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--timeout',
-            type=int,
+            type=float,
             default=30,
             help='Timeout in seconds (default: 30)'
         )
+        parser.add_argument(
+            '--initial-delay',
+            type=float,
+            default=0.05,
+            help='First retry delay in seconds, doubled on each attempt (default: 0.05)'
+        )
+        parser.add_argument(
+            '--max-delay',
+            type=float,
+            default=2.0,
+            help='Upper bound for the retry delay in seconds (default: 2)'
+        )
+        parser.add_argument(
+            '--skip-redis',
+            action='store_true',
+            help='Do not wait for Redis'
+        )
 
-    def handle(self, *args, **options):
-        self.stdout.write('Waiting for database...')
-        db_conn = None
-        timeout = options['timeout']
-        start_time = time.time()
+    def probes(self, options):
+        return dependency_probes(options['max_delay'], redis=not options['skip_redis'])
 
-        while not db_conn:
+    def wait(self, probe, started, deadline, options, cancelled):
+        """Повторяет проверку до успеха; возвращает (время готовности, попытки, ошибку)"""
+        delay = options['initial_delay']
+        attempts = 0
+        while True:
+            attempts += 1
             try:
-                # get the database with 'default' from settings.py
-                db_conn = connections['default']
-                db_conn.cursor()
-                self.stdout.write(
-                    self.style.SUCCESS('Database available!')
-                )
-            except OperationalError:
-                if time.time() - start_time > timeout:
-                    self.stdout.write(
-                        self.style.ERROR(
-                            f'Database connection timeout after {timeout} seconds'
-                        )
-                    )
-                    return
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1) 
\ No newline at end of file
+                probe.check()
+                return time.monotonic() - started, attempts, None
+            except probe.fatal_errors as e:
+                return None, attempts, e
+            except probe.retry_errors as e:
+                error = e
+
+            # Половина задержки фиксирована, половина случайна: контейнеры,
+            # стартовавшие одновременно, не стучатся в базу синхронно
+            pause = delay / 2 + random.uniform(0, delay / 2)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or cancelled.is_set():
+                return None, attempts, error
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'{probe.name} unavailable ({error}), retrying in {pause:.2f}s')
+            cancelled.wait(min(pause, remaining))
+            delay = min(delay * 2, options['max_delay'])
+
+    def handle(self, *args, **options):
+        probes = self.probes(options)
+        self.stdout.write(f"Waiting for {', '.join(probe.name for probe in probes)}...")
+        started = time.monotonic()
+        deadline = started + options['timeout']
+        cancelled = threading.Event()
+
+        executor = ThreadPoolExecutor(max_workers=len(probes))
+        futures = {
+            executor.submit(self.wait, probe, started, deadline, options, cancelled): probe
+            for probe in probes
+        }
+        failed = []
+        try:
+            # Результаты в порядке готовности: отказ одного сервиса завершает
+            # ожидание сразу, а не после тех, что проверяются дольше. Последняя
+            # проверка может занять до max_delay (таймаут соединения)
+            for future in as_completed(futures, timeout=options['timeout'] + options['max_delay']):
+                probe = futures[future]
+                ready_in, attempts, error = future.result()
+                if ready_in is None:
+                    failed.append(f'{probe.name}: {error}')
+                    # Остальные сервисы ждать уже незачем
+                    cancelled.set()
+                    break
+                self.stdout.write(f'{probe.name} ready in {ready_in:.2f}s ({attempts} attempts)')
+        except FutureTimeoutError:
+            failed.extend(f'{futures[future].name}: no response' for future in futures if not future.done())
+        finally:
+            cancelled.set()
+            executor.shutdown(wait=False)
+
+        if failed:
+            raise CommandError(
+                f"Services unavailable after {time.monotonic() - started:.1f}s: " + '; '.join(failed)
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'All services available in {time.monotonic() - started:.2f}s'
+        ))
@@ -0,0 +1,317 @@
+"""
+In-process request metrics for Defect Dojo.
+
+Каждый поток пишет в собственную таблицу серий (view, метод, статус), поэтому
+запись идет без блокировок и без конкуренции между потоками; ``/metrics``
+суммирует таблицы при чтении. Число серий на поток ограничено
+METRICS_MAX_SERIES, лишние попадают в серию view="other". Таблицы
+завершившихся потоков складываются в общую таблицу процесса при
+появлении нового потока и при чтении, так что их число не растет.
+
+Длительность, размер ответа и число запросов учитываются для каждого
+запроса. Запросы к базе (execute wrapper соединения) и обращения к кешу
+считаются только для выборки METRICS_SAMPLE_RATE: их доля в числе
+выбранных запросов - ``dojo_http_sampled_requests_total``.
+
+Под gunicorn у каждого воркера свои таблицы. С METRICS_DIR воркер
+раз в METRICS_FLUSH_INTERVAL секунд сохраняет снимок в файл, ``/metrics``
+складывает снимки всех воркеров, а снимок завершенного воркера мастер
+переносит в общий архив, чтобы счетчики не уменьшались.
+"""
+import fcntl
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache as DjangoLocMemCache
+from django.core.cache.backends.redis import RedisCache as DjangoRedisCache
+
+# Границы гистограммы длительности запроса, секунды
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OTHER_VIEW = 'other'
+UNRESOLVED_VIEW = 'unresolved'
+ARCHIVE_FILE = 'archive.json'
+LOCK_FILE = '.lock'
+
+# Поля серии: число запросов, сумма длительностей, корзины гистограммы
+# (последняя - +Inf), затем счетчики
+COUNT, DURATION = 0, 1
+BUCKETS = 2
+RESPONSE_BYTES = BUCKETS + len(LATENCY_BUCKETS) + 1
+SAMPLED, QUERIES, QUERY_SECONDS, CACHE_HITS, CACHE_MISSES = range(RESPONSE_BYTES + 1, RESPONSE_BYTES + 6)
+SERIES_SIZE = CACHE_MISSES + 1
+
+COUNTERS = (
+    (RESPONSE_BYTES, 'dojo_http_response_bytes_total', 'Bytes in response bodies with a known length.'),
+    (SAMPLED, 'dojo_http_sampled_requests_total', 'Requests sampled for database and cache accounting.'),
+    (QUERIES, 'dojo_db_queries_total', 'Database queries executed by sampled requests.'),
+    (QUERY_SECONDS, 'dojo_db_query_duration_seconds_total', 'Time spent in database queries by sampled requests.'),
+    (CACHE_HITS, 'dojo_cache_hits_total', 'Cache hits in sampled requests.'),
+    (CACHE_MISSES, 'dojo_cache_misses_total', 'Cache misses in sampled requests.'),
+)
+
+
+class RequestStats:
+    """Счетчики базы и кеша выбранного запроса"""
+
+    __slots__ = ('queries', 'query_seconds', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+# Переходит в потоки sync_to_async вместе с контекстом, поэтому работает и под ASGI
+current_stats = ContextVar('dojo_request_stats', default=None)
+
+# (поток, его таблица) для живых потоков и сумма таблиц завершившихся
+_shards = []
+_retired = {}
+_shards_lock = threading.Lock()
+_local = threading.local()
+
+
+def _retire_finished():
+    """Переносит таблицы завершившихся потоков в _retired (под _shards_lock)"""
+    live = []
+    for thread, shard in _shards:
+        if thread.is_alive():
+            live.append((thread, shard))
+        else:
+            # Завершившийся поток в таблицу уже не пишет
+            merge(_retired, shard.items())
+    _shards[:] = live
+
+
+def _shard():
+    shard = getattr(_local, 'series', None)
+    if shard is None:
+        shard = _local.series = {}
+        # Блокировка только при первом запросе потока; запись в таблицу идет без нее
+        with _shards_lock:
+            _retire_finished()
+            _shards.append((threading.current_thread(), shard))
+    return shard
+
+
+def sample():
+    """Статистика для нового запроса или None, если он не попал в выборку"""
+    rate = settings.METRICS_SAMPLE_RATE
+    if rate >= 1 or random.random() < rate:
+        return RequestStats()
+    return None
+
+
+def record(view, method, status, duration, response_bytes, stats):
+    shard = _shard()
+    key = (view, method, status)
+    series = shard.get(key)
+    if series is None:
+        if len(shard) >= settings.METRICS_MAX_SERIES:
+            key = (OTHER_VIEW, method, status)
+            series = shard.get(key)
+        if series is None:
+            series = shard[key] = [0] * SERIES_SIZE
+    series[COUNT] += 1
+    series[DURATION] += duration
+    series[BUCKETS + bisect_left(LATENCY_BUCKETS, duration)] += 1
+    if response_bytes is not None:
+        series[RESPONSE_BYTES] += response_bytes
+    if stats is not None:
+        series[SAMPLED] += 1
+        series[QUERIES] += stats.queries
+        series[QUERY_SECONDS] += stats.query_seconds
+        series[CACHE_HITS] += stats.cache_hits
+        series[CACHE_MISSES] += stats.cache_misses
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper соединения: время и число запросов выбранного запроса"""
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_seconds += time.perf_counter() - start
+
+
+def record_cache(hits, misses):
+    stats = current_stats.get()
+    if stats is not None:
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+
+
+class InstrumentedCacheMixin:
+    """Считает попадания и промахи get/get_many; async-методы кеша Django идут через них"""
+
+    _missing = object()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._missing, version)
+        if value is self._missing:
+            record_cache(0, 1)
+            return default
+        record_cache(1, 0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        record_cache(len(found), len(keys) - len(found))
+        return found
+
+
+class RedisCache(InstrumentedCacheMixin, DjangoRedisCache):
+    pass
+
+
+class LocMemCache(InstrumentedCacheMixin, DjangoLocMemCache):
+    pass
+
+
+def merge(target, snapshot):
+    for key, values in snapshot:
+        series = target.setdefault(tuple(key), [0] * SERIES_SIZE)
+        for index, value in enumerate(values):
+            series[index] += value
+    return target
+
+
+def local_snapshot():
+    """Серии всех потоков процесса; значения серии могут отставать друг от друга на один запрос"""
+    with _shards_lock:
+        _retire_finished()
+        merged = merge({}, _retired.items())
+        shards = [shard for _, shard in _shards]
+    for shard in shards:
+        merge(merged, [(key, list(values)) for key, values in list(shard.items())])
+    return list(merged.items())
+
+
+def write_snapshot(path, snapshot):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return []
+
+
+@contextmanager
+def locked(directory, operation):
+    with open(os.path.join(directory, LOCK_FILE), 'a') as f:
+        fcntl.flock(f, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def worker_file(directory, pid):
+    return os.path.join(directory, f'{pid}.json')
+
+
+def flush():
+    """Сохраняет снимок процесса в METRICS_DIR"""
+    directory = settings.METRICS_DIR
+    if directory:
+        write_snapshot(worker_file(directory, os.getpid()), local_snapshot())
+
+
+def _flush_forever():
+    while True:
+        time.sleep(settings.METRICS_FLUSH_INTERVAL)
+        flush()
+
+
+def start_flusher():
+    """Запускает сохранение снимков в воркере (post_fork gunicorn)"""
+    if settings.METRICS_DIR:
+        threading.Thread(target=_flush_forever, name='metrics-flush', daemon=True).start()
+
+
+def retire(directory, pid):
+    """
+    Переносит снимок завершенного воркера в архив.
+
+    Вызывается в мастере gunicorn (child_exit), где настройки Django могут
+    быть не загружены, поэтому каталог передается явно.
+    """
+    path = worker_file(directory, pid)
+    if not os.path.exists(path):
+        return
+    with locked(directory, fcntl.LOCK_EX):
+        archive = os.path.join(directory, ARCHIVE_FILE)
+        merged = merge(merge({}, read_snapshot(archive)), read_snapshot(path))
+        write_snapshot(archive, list(merged.items()))
+        os.unlink(path)
+
+
+def snapshot():
+    """Серии процесса, а с METRICS_DIR - всех воркеров, включая завершенные"""
+    directory = settings.METRICS_DIR
+    if not directory:
+        return local_snapshot()
+    own = worker_file(directory, os.getpid())
+    merged = merge({}, local_snapshot())
+    with locked(directory, fcntl.LOCK_SH):
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith('.json') and path != own:
+                merge(merged, read_snapshot(path))
+    return list(merged.items())
+
+
+def _labels(key, **extra):
+    view, method, status = key
+    pairs = {'view': view, 'method': method, 'status': status, **extra}
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in pairs.items()
+    )
+
+
+def render(series):
+    """Текстовый формат экспозиции Prometheus 0.0.4"""
+    series = sorted(series)
+    name = 'dojo_http_request_duration_seconds'
+    lines = [
+        f'# HELP {name} Request latency by view, method and status.',
+        f'# TYPE {name} histogram',
+    ]
+    for key, values in series:
+        cumulative = 0
+        for index, bound in enumerate(LATENCY_BUCKETS + ('+Inf',)):
+            cumulative += values[BUCKETS + index]
+            lines.append(f'{name}_bucket{{{_labels(key, le=bound)}}} {cumulative}')
+        lines.append(f'{name}_sum{{{_labels(key)}}} {values[DURATION]}')
+        lines.append(f'{name}_count{{{_labels(key)}}} {values[COUNT]}')
+
+    for index, name, help_text in COUNTERS:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        lines.extend(f'{name}{{{_labels(key)}}} {values[index]}' for key, values in series)
+    return '\n'.join(lines) + '\n'
@@ -1,37 +1,177 @@
 """
-Custom middleware for security improvements
+Custom middleware for security improvements and request metrics
 """
+import time
 
-from django.http import HttpResponseForbidden
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponseForbidden
+
+from dojo import metrics
+
+# Разрешенные HTTP методы по префиксу пути
+METHOD_POLICY = {
+    '/admin/': ('GET', 'POST'),
+    '/api/': ('GET', 'POST', 'PUT', 'DELETE'),
+}
+
+SECURITY_HEADERS = {
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '1; mode=block',
+    # Заголовки для защиты от Spectre
+    'Referrer-Policy': 'strict-origin-when-cross-origin',
+    'Cross-Origin-Opener-Policy': 'same-origin',
+    'Cross-Origin-Embedder-Policy': 'require-corp',
+}
+
+
+class MethodPolicy:
+    """
+    Таблица METHOD_POLICY, собранная в дерево по сегментам пути.
+
+    Поиск проходит сегменты пути только на глубину дерева и возвращает
+    frozenset методов самого длинного совпавшего префикса (None - без
+    ограничений). Префикс совпадает, только если за сегментом идет '/',
+    как у ``startswith('/api/')``.
+    """
+
+    def __init__(self, policy):
+        self.root = {}
+        for prefix, methods in policy.items():
+            node = self.root
+            segments = prefix.strip('/').split('/')
+            for segment in segments[:-1]:
+                node = node.setdefault(segment, (None, {}))[1]
+            node[segments[-1]] = (frozenset(methods), node.get(segments[-1], (None, {}))[1])
+
+    def allowed(self, path):
+        allowed = None
+        node = self.root
+        start = 1
+        while node:
+            end = path.find('/', start)
+            if end == -1:
+                break
+            entry = node.get(path[start:end])
+            if entry is None:
+                break
+            if entry[0] is not None:
+                allowed = entry[0]
+            node = entry[1]
+            start = end + 1
+        return allowed
+
 
 class SecurityMiddleware:
-    """Middleware для улучшения безопасности"""
-    
+    """
+    Middleware для улучшения безопасности.
+
+    Политика методов и список заголовков собираются один раз при запуске.
+    Заголовки, уже выставленные view, не перезаписываются; middleware
+    стоит последним в MIDDLEWARE, поэтому SecurityMiddleware и
+    XFrameOptionsMiddleware Django видят готовые заголовки и не считают их
+    заново. Middleware работает и синхронно, и асинхронно, без перехода
+    между потоками под ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+        self.policy = MethodPolicy(METHOD_POLICY)
+        # (имя в нижнем регистре, имя, значение) собираются один раз при запуске
+        self.prepared = tuple((name.lower(), name, value) for name, value in SECURITY_HEADERS.items())
+
+    def forbidden(self, request):
+        allowed = self.policy.allowed(request.path)
+        return allowed is not None and request.method not in allowed
+
+    def add_headers(self, response):
+        headers = response.headers
+        # Один проход по заголовкам ответа вместо setdefault: промах в нем
+        # стоит исключения KeyError на каждый добавляемый заголовок
+        present = {name.lower() for name in headers}
+        for key, name, value in self.prepared:
+            if key not in present:
+                headers[name] = value
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if self.forbidden(request):
+            return self.add_headers(HttpResponseForbidden("Method not allowed"))
+        return self.add_headers(self.get_response(request))
+
+    async def __acall__(self, request):
+        if self.forbidden(request):
+            return self.add_headers(HttpResponseForbidden("Method not allowed"))
+        return self.add_headers(await self.get_response(request))
+
+
+class InstrumentationMiddleware:
+    """
+    Длительность, размер ответа, запросы к базе и кеш по view.
+
+    Стоит первым в MIDDLEWARE и измеряет всю цепочку. Для потоковых ответов
+    длительность - время до начала отправки тела, а размер известен только
+    по Content-Length. Агрегаты и формат экспозиции - в dojo.metrics.
+    """
+
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
         self.get_response = get_response
-        
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def record(self, request, response, duration, stats):
+        match = request.resolver_match
+        length = response.get('Content-Length')
+        if length is not None:
+            length = int(length)
+        elif not response.streaming:
+            length = len(response.content)
+        metrics.record(
+            match.view_name if match else metrics.UNRESOLVED_VIEW,
+            request.method,
+            str(response.status_code),
+            duration,
+            length,
+            stats,
+        )
+
     def __call__(self, request):
-        # Ограничиваем HTTP методы для admin
-        if request.path.startswith('/admin/'):
-            if request.method not in ['GET', 'POST']:
-                return HttpResponseForbidden("Method not allowed")
-        
-        # Ограничиваем HTTP методы для API
-        if request.path.startswith('/api/'):
-            if request.method not in ['GET', 'POST', 'PUT', 'DELETE']:
-                return HttpResponseForbidden("Method not allowed")
-        
-        response = self.get_response(request)
-        
-        # Добавляем заголовки безопасности
-        response['X-Content-Type-Options'] = 'nosniff'
-        response['X-Frame-Options'] = 'DENY'
-        response['X-XSS-Protection'] = '1; mode=block'
-        
-        # Добавляем заголовки для защиты от Spectre
-        response['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-        response['Cross-Origin-Opener-Policy'] = 'same-origin'
-        response['Cross-Origin-Embedder-Policy'] = 'require-corp'
-        
-        return response 
\ No newline at end of file
+        if self.is_async:
+            return self.__acall__(request)
+        stats = metrics.sample()
+        token = metrics.current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_stats.reset(token)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = metrics.sample()
+        token = metrics.current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_stats.reset(token)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
@@ -0,0 +1,68 @@
+# Generated by Django 4.1.13 on 2026-10-18 00:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Engagement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('description', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Finding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=511)),
+                ('description', models.TextField(blank=True)),
+                ('severity', models.CharField(choices=[('Critical', 'Critical'), ('High', 'High'), ('Medium', 'Medium'), ('Low', 'Low'), ('Info', 'Info')], max_length=16)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('mitigated', 'Mitigated'), ('false_positive', 'False positive'), ('risk_accepted', 'Risk accepted')], default='active', max_length=32)),
+                ('scanner', models.CharField(max_length=64)),
+                ('cwe', models.PositiveIntegerField(blank=True, null=True)),
+                ('file_path', models.CharField(blank=True, max_length=1024)),
+                ('line', models.PositiveIntegerField(blank=True, null=True)),
+                ('endpoint', models.CharField(blank=True, max_length=2048)),
+                ('fingerprint', models.CharField(max_length=16)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('engagement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='findings', to='dojo.engagement')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='findings', to='dojo.product')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='engagement',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='engagements', to='dojo.product'),
+        ),
+        migrations.AddIndex(
+            model_name='finding',
+            index=models.Index(fields=['product', 'severity', 'status'], name='finding_product_sev_status'),
+        ),
+        migrations.AddIndex(
+            model_name='finding',
+            index=models.Index(fields=['fingerprint'], name='finding_fingerprint'),
+        ),
+    ]
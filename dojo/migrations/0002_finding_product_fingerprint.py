@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-18 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dojo', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='finding',
+            constraint=models.UniqueConstraint(fields=('product', 'fingerprint'), name='finding_product_fingerprint'),
+        ),
+    ]
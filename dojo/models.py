@@ -0,0 +1,90 @@
+"""
+Models for Defect Dojo.
+
+Продукт содержит проверки (engagements), а находки относятся к проверке и,
+для выборок по продукту без JOIN, напрямую к продукту.
+"""
+from django.db import models
+
+
+class Product(models.Model):
+    """Продукт, для которого ведется учет уязвимостей"""
+
+    name = models.CharField(max_length=255, unique=True)
+    description = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Engagement(models.Model):
+    """Проверка продукта: один прогон пайплайна или ручной аудит"""
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='engagements')
+    name = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.product} / {self.name}"
+
+
+class Finding(models.Model):
+    """Находка сканера безопасности"""
+
+    SEVERITY_CRITICAL = 'Critical'
+    SEVERITY_HIGH = 'High'
+    SEVERITY_MEDIUM = 'Medium'
+    SEVERITY_LOW = 'Low'
+    SEVERITY_INFO = 'Info'
+    SEVERITY_CHOICES = [
+        (SEVERITY_CRITICAL, 'Critical'),
+        (SEVERITY_HIGH, 'High'),
+        (SEVERITY_MEDIUM, 'Medium'),
+        (SEVERITY_LOW, 'Low'),
+        (SEVERITY_INFO, 'Info'),
+    ]
+
+    STATUS_ACTIVE = 'active'
+    STATUS_MITIGATED = 'mitigated'
+    STATUS_FALSE_POSITIVE = 'false_positive'
+    STATUS_RISK_ACCEPTED = 'risk_accepted'
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Active'),
+        (STATUS_MITIGATED, 'Mitigated'),
+        (STATUS_FALSE_POSITIVE, 'False positive'),
+        (STATUS_RISK_ACCEPTED, 'Risk accepted'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='findings')
+    engagement = models.ForeignKey(Engagement, on_delete=models.CASCADE, related_name='findings')
+    title = models.CharField(max_length=511)
+    description = models.TextField(blank=True)
+    severity = models.CharField(max_length=16, choices=SEVERITY_CHOICES)
+    status = models.CharField(max_length=32, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    scanner = models.CharField(max_length=64)
+    cwe = models.PositiveIntegerField(null=True, blank=True)
+    file_path = models.CharField(max_length=1024, blank=True)
+    line = models.PositiveIntegerField(null=True, blank=True)
+    endpoint = models.CharField(max_length=2048, blank=True)
+    # 64-битный отпечаток находки в hex, тот же, что считает Security Gateway
+    fingerprint = models.CharField(max_length=16)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Основной фильтр списка: находки продукта по критичности и статусу
+            models.Index(fields=['product', 'severity', 'status'], name='finding_product_sev_status'),
+            models.Index(fields=['fingerprint'], name='finding_fingerprint'),
+        ]
+        constraints = [
+            # Повторный импорт той же находки обновляет запись, а не создает новую
+            models.UniqueConstraint(fields=['product', 'fingerprint'], name='finding_product_fingerprint'),
+        ]
+
+    def __str__(self):
+        return f"[{self.severity}] {self.title}"
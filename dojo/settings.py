@@ -25,13 +25,17 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
     'crispy_forms',
     'crispy_bootstrap5',
+    'django_celery_results',
     'dojo',
 ]
 
 MIDDLEWARE = [
+    # Первым, чтобы в длительность запроса попала вся цепочка
+    'dojo.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -41,6 +45,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Политика HTTP методов и заголовки, которых нет у middleware Django
+    'dojo.middleware.SecurityMiddleware',
 ]
 
 ROOT_URLCONF = 'dojo.urls'
@@ -62,9 +68,24 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'dojo.wsgi.application'
+# Процесс запущен через dojo.asgi (uvicorn): API использует асинхронные действия
+ASGI = os.environ.get('DOJO_ASGI', 'False').lower() == 'true'
 
 # Database
 DB_ENGINE = os.environ.get('DB_ENGINE', 'django.db.backends.postgresql')
+# Постоянные соединения: секунды жизни (0 - соединение на запрос) и проверка перед переиспользованием.
+# Каждый поток web держит свое соединение, поэтому без пулера нужно
+#   реплики web x GUNICORN_WORKERS x GUNICORN_THREADS + процессы celery + 3 (резерв суперпользователя)
+#   <= DB_MAX_CONNECTIONS.
+# По умолчанию воркеров не больше 8 (dojo.cpu): 8 x 4 потока = 32 соединения на реплику,
+# три реплики с воркером celery укладываются в max_connections=100. Проверка dojo.W002
+# сверяет одну реплику; при большем числе реплик включите DB_POOLER=pgbouncer.
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+DB_CONN_HEALTH_CHECKS = os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true'
+# Пулер соединений перед PostgreSQL: '' - напрямую, 'pgbouncer' - pgbouncer в режиме transaction
+DB_POOLER = os.environ.get('DB_POOLER', '')
+# Предел соединений PostgreSQL (max_connections), с которым сверяется число потоков web
+DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 100))
 
 if DB_ENGINE == 'django.db.backends.sqlite3':
     DATABASES = {
@@ -82,8 +103,17 @@ else:
             'PASSWORD': os.environ.get('DB_PASSWORD', 'defectdojo'),
             'HOST': os.environ.get('DB_HOST', 'db'),
             'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
         }
     }
+    if DB_POOLER == 'pgbouncer':
+        DATABASES['default'].update({
+            'HOST': os.environ.get('DB_POOLER_HOST', 'pgbouncer'),
+            'PORT': os.environ.get('DB_POOLER_PORT', '6432'),
+            # Курсор не переживает транзакцию, а сервер между транзакциями может смениться
+            'DISABLE_SERVER_SIDE_CURSORS': True,
+        })
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -110,9 +140,22 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Метка сборки образа: миграции и статика, собранные в Dockerfile (manage.py startup --build)
+STARTUP_STAMP_FILE = os.environ.get('STARTUP_STAMP_FILE', str(BASE_DIR / '.build-stamp'))
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+# Статика собирается при сборке образа: имена с хешем содержимого и готовые .gz/.br
+# рядом с файлами. nginx отдает их с диска сам, WhiteNoise - при обращении напрямую к
+# порту 8000, в обоих случаях без сжатия на запрос; файлы с хешем кешируются на год
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -125,7 +168,7 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'dojo.api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -134,6 +177,72 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 25,
 }
 
+# Импорт отчетов сканеров: число находок в одном INSERT
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+# Загруженные отчеты ждут здесь обработки воркером (каталог общий для web и worker)
+IMPORT_UPLOAD_DIR = Path(os.environ.get('IMPORT_UPLOAD_DIR', BASE_DIR / 'uploads' / 'imports'))
+
+# Выгрузка находок: строк на одно чтение курсора и одну запись в ответ
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+
+# Celery: брокер - Redis, результаты задач - в базе (django-celery-results).
+# Без REDIS_URL Redis не используется: кеш в памяти процесса, задачи в запросе
+REDIS_URL = os.environ.get('REDIS_URL', '')
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', REDIS_URL)
+CELERY_RESULT_BACKEND = 'django-db'
+CELERY_RESULT_EXTENDED = True
+CELERY_TASK_TRACK_STARTED = True
+# Импорт - долгая задача: воркер берет следующую только после завершения текущей
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_ACKS_LATE = True
+# Eager-режим выполняет задачи в процессе запроса (тесты и локальный запуск без брокера)
+CELERY_TASK_ALWAYS_EAGER = os.environ.get(
+    'CELERY_TASK_ALWAYS_EAGER', 'False' if CELERY_BROKER_URL else 'True'
+).lower() == 'true'
+CELERY_TASK_STORE_EAGER_RESULT = True
+
+# Кеш: Redis из CACHE_URL или REDIS_URL, без них - память процесса (locmem).
+# Бэкенды Django с подсчетом попаданий для метрик запросов
+CACHE_URL = os.environ.get('CACHE_URL', REDIS_URL)
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'redis' if CACHE_URL else 'locmem')
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'dojo.metrics.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'dojo',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'dojo.metrics.LocMemCache',
+        }
+    }
+
+# Сессии читаются из кеша, база - только при промахе и при записи
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+# Сколько секунд пользователь API-токена берется из кеша без запроса к базе
+API_TOKEN_CACHE_TTL = int(os.environ.get('API_TOKEN_CACHE_TTL', 60))
+# Время жизни закешированной страницы списка находок
+API_LIST_CACHE_TTL = int(os.environ.get('API_LIST_CACHE_TTL', 300))
+
+# /health/ready: таймаут каждой проверки и сколько секунд результат берется из памяти
+HEALTH_PROBE_TIMEOUT = float(os.environ.get('HEALTH_PROBE_TIMEOUT', 2))
+HEALTH_READY_TTL = float(os.environ.get('HEALTH_READY_TTL', 5))
+
+# Метрики запросов в формате Prometheus на /metrics
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+# Доля запросов, для которых считаются запросы к базе и обращения к кешу
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', 1.0))
+# Предел числа серий (view, метод, статус) на поток
+METRICS_MAX_SERIES = int(os.environ.get('METRICS_MAX_SERIES', 500))
+# Каталог снимков воркеров gunicorn; пустое значение - метрики только своего процесса
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 10))
+# Если задан, /metrics требует заголовок Authorization: Bearer <токен>
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:8000",
@@ -156,38 +265,6 @@ SECURE_HSTS_SECONDS = 31536000  # 1 год
 SECURE_HSTS_INCLUDE_SUBDOMAINS = True
 SECURE_HSTS_PRELOAD = True
 
-# Дополнительные middleware для безопасности
-SECURITY_MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'corsheaders.middleware.CorsMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
-
-# Используем расширенный middleware для продакшена
-if not DEBUG:
-    MIDDLEWARE = SECURITY_MIDDLEWARE + [
-        'dojo.middleware.SecurityMiddleware',
-    ]
-else:
-    MIDDLEWARE = [
-        'django.middleware.security.SecurityMiddleware',
-        'whitenoise.middleware.WhiteNoiseMiddleware',
-        'django.contrib.sessions.middleware.SessionMiddleware',
-        'corsheaders.middleware.CorsMiddleware',
-        'django.middleware.common.CommonMiddleware',
-        'django.middleware.csrf.CsrfViewMiddleware',
-        'django.contrib.auth.middleware.AuthenticationMiddleware',
-        'django.contrib.messages.middleware.MessageMiddleware',
-        'django.middleware.clickjacking.XFrameOptionsMiddleware',
-        'dojo.middleware.SecurityMiddleware',
-    ]
-
 # Logging
 LOGGING = {
     'version': 1,
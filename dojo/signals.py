@@ -0,0 +1,39 @@
+"""
+Signal handlers for Defect Dojo.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from dojo.cache import invalidate_findings, token_cache_key
+from dojo.metrics import record_query
+from dojo.models import Engagement, Finding, Product
+
+
+# У Finding нет post_delete: обработчик отключил бы быстрое удаление, и удаление
+# продукта загружало бы каждую находку. Массовые операции с находками (импорт,
+# удаление в админке) сбрасывают кеш сами, один раз через on_commit
+@receiver(post_save, sender=Finding)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Engagement)
+@receiver(post_delete, sender=Engagement)
+def findings_changed(sender, **kwargs):
+    """Сбрасывает кеш списков после фиксации транзакции"""
+    transaction.on_commit(invalidate_findings)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    cache.delete(token_cache_key(instance.key))
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    """Учет запросов к базе для метрик; обертка остается на соединении и после переподключения"""
+    if settings.METRICS_ENABLED and record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
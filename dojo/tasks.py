@@ -0,0 +1,41 @@
+"""
+Celery tasks for Defect Dojo.
+"""
+import os
+
+from django.core.files import File
+
+from dojo.celery import app
+from dojo.importers import ScanImportError, import_scan
+from dojo.models import Product
+
+
+# Ошибка разбора отчета - ожидаемый исход, без трассировки в логе воркера
+@app.task(bind=True, throws=(ScanImportError,))
+def import_scan_task(self, upload_path, product_id, engagement_name=None, scan_type=None):
+    """
+    Фоновый импорт сохраненного отчета.
+
+    Пачки фиксируются по одной, а после каждой в результат задачи
+    записывается ход импорта (состояние PROGRESS), который отдает
+    эндпоинт статуса. Файл отчета удаляется после обработки.
+    """
+    def progress(meta):
+        self.update_state(state='PROGRESS', meta=meta)
+
+    try:
+        # Файл удаляется и тогда, когда продукт успели удалить до запуска задачи
+        product = Product.objects.get(pk=product_id)
+        with open(upload_path, 'rb') as f:
+            result = import_scan(
+                File(f, name=os.path.basename(upload_path)), product,
+                engagement_name=engagement_name,
+                scan_type=scan_type,
+                atomic=False,
+                progress=progress,
+            )
+    finally:
+        os.unlink(upload_path)
+
+    result['product'] = product_id
+    return result
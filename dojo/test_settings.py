@@ -0,0 +1,26 @@
+"""
+Django settings for the Defect Dojo test suite.
+
+Тесты не требуют PostgreSQL и Redis: база SQLite, кеш в памяти процесса,
+задачи Celery выполняются сразу в процессе теста.
+"""
+from dojo.settings import *  # noqa: F401,F403
+from dojo.settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test.sqlite3',
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'dojo.metrics.LocMemCache',
+    }
+}
+
+CELERY_TASK_ALWAYS_EAGER = True
+
+# Снимки метрик воркеров gunicorn тестам не нужны
+METRICS_DIR = ''
@@ -0,0 +1,32 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from dojo.models import Engagement, Product
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Кеш в памяти общий для всех тестов процесса
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user('tester', password='tester')
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def engagement(db):
+    product = Product.objects.create(name='product')
+    return Engagement.objects.create(product=product, name='engagement')
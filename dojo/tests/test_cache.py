@@ -0,0 +1,74 @@
+import pytest
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from dojo.api.authentication import CachedTokenAuthentication
+from dojo.cache import findings_version, token_cache_key
+from dojo.models import Finding
+from dojo.tests.test_vulnerabilities import seed_findings
+
+
+def test_product_delete_removes_findings_without_loading_them(engagement, django_capture_on_commit_callbacks):
+    seed_findings(engagement, 50)
+    version = findings_version()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with CaptureQueriesContext(connection) as queries:
+            engagement.product.delete()
+
+    # Находки удаляются DELETE по связи, без выборки строк
+    finding_queries = [query['sql'] for query in queries.captured_queries if 'dojo_finding' in query['sql']]
+    assert finding_queries and all(sql.startswith('DELETE') for sql in finding_queries)
+    assert not Finding.objects.exists()
+    assert findings_version() != version
+
+
+def test_admin_bulk_delete_invalidates_lists(engagement, django_capture_on_commit_callbacks):
+    seed_findings(engagement, 5)
+    version = findings_version()
+    model_admin = site._registry[Finding]
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        model_admin.delete_queryset(RequestFactory().post('/admin/'), Finding.objects.all())
+
+    assert len(callbacks) == 1
+    assert not Finding.objects.exists()
+    assert findings_version() != version
+
+
+def test_token_cache_keeps_only_user_id(user):
+    token = Token.objects.create(user=user)
+    auth = CachedTokenAuthentication()
+
+    assert auth.authenticate_credentials(token.key)[0] == user
+    assert cache.get(token_cache_key(token.key)) == user.pk
+
+    # Попадание в кеш: пользователь читается по первичному ключу, без токенов
+    with CaptureQueriesContext(connection) as queries:
+        cached_user, cached_token = auth.authenticate_credentials(token.key)
+    assert cached_user == user and cached_token.key == token.key
+    assert not any('authtoken_token' in query['sql'] for query in queries.captured_queries)
+
+
+def test_token_cache_rejects_inactive_user(user):
+    token = Token.objects.create(user=user)
+    auth = CachedTokenAuthentication()
+    auth.authenticate_credentials(token.key)
+
+    # update() не шлет сигналов: отказ дает только проверка свежей строки
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    with pytest.raises(AuthenticationFailed):
+        auth.authenticate_credentials(token.key)
+    assert cache.get(token_cache_key(token.key)) is None
+
+
+def test_user_save_does_not_query_tokens(user):
+    with CaptureQueriesContext(connection) as queries:
+        user.save(update_fields=['last_login'])
+    assert not any('authtoken_token' in query['sql'] for query in queries.captured_queries)
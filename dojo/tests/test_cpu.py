@@ -0,0 +1,35 @@
+import pytest
+
+from dojo import cpu
+
+
+@pytest.fixture
+def cgroup(tmp_path, monkeypatch):
+    monkeypatch.setattr(cpu, 'CGROUP_V2_CPU_MAX', str(tmp_path / 'cpu.max'))
+    monkeypatch.setattr(cpu, 'CGROUP_V1_QUOTA', str(tmp_path / 'cpu.cfs_quota_us'))
+    monkeypatch.setattr(cpu, 'CGROUP_V1_PERIOD', str(tmp_path / 'cpu.cfs_period_us'))
+    monkeypatch.setattr(cpu.os, 'sched_getaffinity', lambda pid: set(range(64)), raising=False)
+    return tmp_path
+
+
+def test_cgroup_v2_quota_limits_workers(cgroup):
+    (cgroup / 'cpu.max').write_text('150000 100000\n')
+    assert cpu.available_cpus() == 2
+    assert cpu.default_workers() == 5
+
+
+def test_cgroup_v1_quota(cgroup):
+    (cgroup / 'cpu.cfs_quota_us').write_text('100000\n')
+    (cgroup / 'cpu.cfs_period_us').write_text('100000\n')
+    assert cpu.available_cpus() == 1
+
+
+def test_unlimited_quota_uses_affinity_and_cap(cgroup):
+    (cgroup / 'cpu.max').write_text('max 100000\n')
+    assert cpu.available_cpus() == 64
+    assert cpu.default_workers() == cpu.MAX_DEFAULT_WORKERS
+
+
+def test_explicit_workers_override_default(cgroup, monkeypatch):
+    monkeypatch.setenv('GUNICORN_WORKERS', '20')
+    assert cpu.gunicorn_workers() == 20
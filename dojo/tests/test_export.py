@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+import zipfile
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from dojo import exporters
+from dojo.models import Finding
+from dojo.tests.test_vulnerabilities import URL, seed_findings
+
+
+def content(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.parametrize('export_format, accept', [
+    ('csv', 'text/csv'),
+    ('jsonl', 'application/x-ndjson'),
+    ('xlsx', exporters.XlsxExporter.content_type),
+])
+def test_export_accepts_its_content_type(api_client, engagement, export_format, accept):
+    seed_findings(engagement, 3)
+
+    response = api_client.get(f'{URL}export/{export_format}/', HTTP_ACCEPT=accept)
+
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith(accept)
+    assert response['Content-Disposition'] == f'attachment; filename="findings.{export_format}"'
+
+
+def test_csv_export_escapes_formulas(api_client, engagement):
+    Finding.objects.create(product=engagement.product, engagement=engagement, title='=HYPERLINK("x")',
+                           description='-1+1', severity=Finding.SEVERITY_LOW, scanner='test')
+
+    response = api_client.get(f'{URL}export/csv/', {'fields': 'title,description,severity'})
+
+    rows = list(csv.reader(io.StringIO(content(response).decode())))
+    assert rows == [['title', 'description', 'severity'], ["'=HYPERLINK(\"x\")", "'-1+1", 'Low']]
+
+
+def test_jsonl_export_streams_one_object_per_line(api_client, engagement, settings):
+    settings.EXPORT_CHUNK_SIZE = 2
+    seed_findings(engagement, 5)
+
+    response = api_client.get(f'{URL}export/jsonl/', {'fields': 'id,title,product_name'})
+
+    lines = content(response).decode().splitlines()
+    assert [json.loads(line)['title'] for line in lines] == [f'Finding {i}' for i in range(5)]
+    assert json.loads(lines[0])['product_name'] == 'product'
+
+
+def test_xlsx_export_continues_on_new_sheet(api_client, engagement, monkeypatch):
+    monkeypatch.setattr(exporters, 'XLSX_MAX_ROWS', 3)
+    seed_findings(engagement, 5)
+
+    response = api_client.get(f'{URL}export/xlsx/', {'fields': 'id,title'})
+
+    # Заголовок и две строки на лист: 2 + 2 + 1
+    with zipfile.ZipFile(io.BytesIO(content(response))) as workbook:
+        sheets = sorted(name for name in workbook.namelist() if name.startswith('xl/worksheets/sheet'))
+        assert sheets == ['xl/worksheets/sheet1.xml', 'xl/worksheets/sheet2.xml', 'xl/worksheets/sheet3.xml']
+        assert workbook.read('xl/worksheets/sheet3.xml').count(b'<row ') == 2
+
+
+def test_export_pages_by_id_without_server_side_cursors(api_client, engagement, settings, monkeypatch):
+    monkeypatch.setitem(connection.settings_dict, 'DISABLE_SERVER_SIDE_CURSORS', True)
+    settings.EXPORT_CHUNK_SIZE = 2
+    seed_findings(engagement, 5)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(f'{URL}export/csv/', {'fields': 'title'})
+        rows = list(csv.reader(io.StringIO(content(response).decode())))
+
+    assert [row[0] for row in rows[1:]] == [f'Finding {i}' for i in range(5)]
+    # Страницы 2 + 2 + 1 и пустая: каждая по условию на id, без OFFSET
+    pages = [query['sql'] for query in queries.captured_queries if 'LIMIT 2' in query['sql']]
+    assert len(pages) == 4
+    assert all('OFFSET' not in sql for sql in pages)
+    assert all('"dojo_finding"."id" >' in sql for sql in pages[1:])
@@ -0,0 +1,66 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.urls import resolve
+
+from dojo.health import views
+from dojo.health.probes import DatabaseProbe, RedisProbe, dependency_probes
+
+
+def probe_keys(probes):
+    return [probe.key for probe in probes]
+
+
+def test_probes_without_redis(settings):
+    settings.CACHES = {'default': {'BACKEND': 'dojo.metrics.LocMemCache'}}
+    settings.CELERY_BROKER_URL = ''
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+
+    probes = dependency_probes(1)
+
+    assert all(isinstance(probe, DatabaseProbe) for probe in probes)
+    assert probe_keys(probes) == ['database:default']
+
+
+def test_eager_mode_skips_broker(settings):
+    settings.CELERY_BROKER_URL = 'redis://redis:6379/0'
+    settings.CELERY_TASK_ALWAYS_EAGER = True
+
+    assert 'broker' not in probe_keys(dependency_probes(1))
+
+
+def test_redis_broker_is_probed(settings):
+    settings.CELERY_BROKER_URL = 'redis://:secret@redis:6379/0'
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+
+    broker = [probe for probe in dependency_probes(1) if probe.key == 'broker']
+
+    assert len(broker) == 1 and isinstance(broker[0], RedisProbe)
+    # Пароль из URL в имя проверки не попадает
+    assert 'secret' not in broker[0].name
+
+
+def test_liveness_payload(client):
+    response = client.get('/health/')
+
+    assert response.status_code == 200
+    assert response.json() == {'status': 'healthy', 'service': 'Defect Dojo DevSecOps', 'version': '1.0.0'}
+
+
+def test_wsgi_uses_sync_health_views():
+    # Асинхронное представление под WSGI запускало бы цикл событий на каждый запрос
+    assert resolve('/health/').func is views.live
+    assert resolve('/health/ready').func is views.ready
+
+
+def test_asgi_liveness_payload(rf):
+    response = async_to_sync(views.async_live)(rf.get('/health/'))
+
+    assert json.loads(response.content) == views.LIVENESS
+
+
+def test_readiness(client, db):
+    response = client.get('/health/ready')
+
+    assert response.status_code == 200
+    assert response.json()['status'] == 'ready'
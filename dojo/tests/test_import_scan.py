@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from dojo.importers import import_scan
+from dojo.models import Finding, Product
+
+URL = '/api/vulnerabilities/import-scan/'
+
+
+def zap_report(count):
+    alerts = [
+        {'pluginid': str(10000 + i), 'name': f'Alert {i}', 'risk': 'High', 'url': f'https://app.example/items/{i}'}
+        for i in range(count)
+    ]
+    return SimpleUploadedFile('zap.json', json.dumps({'alerts': alerts}).encode(), content_type='application/json')
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(settings, tmp_path):
+    # С CELERY_TASK_ALWAYS_EAGER (dojo.test_settings) задача выполняется в запросе импорта
+    settings.IMPORT_UPLOAD_DIR = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_scan_runs_eagerly(api_client, upload_dir):
+    response = api_client.post(URL, {'file': zap_report(30), 'product_name': 'imported'}, format='multipart')
+
+    assert response.status_code == 202
+    assert response.data['scan_type'] == 'zap'
+    product = Product.objects.get(name='imported')
+    assert response.data['product'] == product.pk
+    assert Finding.objects.filter(product=product).count() == 30
+    # Файл отчета удален после обработки
+    assert not list(upload_dir.iterdir())
+
+    status_response = api_client.get(response.data['status_url'])
+    assert status_response.status_code == 200
+    assert status_response.data['status'] == 'SUCCESS'
+    assert status_response.data['result']['imported'] == 30
+    assert status_response.data['result']['product'] == product.pk
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_scan_reports_parse_error(api_client, upload_dir):
+    report = SimpleUploadedFile('zap.json', b'{"alerts": [{"name": ')
+    response = api_client.post(URL, {'file': report, 'product_name': 'broken', 'scan_type': 'zap'}, format='multipart')
+
+    assert response.status_code == 202
+    status_response = api_client.get(response.data['status_url'])
+    assert status_response.data['status'] == 'FAILURE'
+    assert 'Invalid' in status_response.data['error']
+    assert not list(upload_dir.iterdir())
+
+
+def test_import_scan_rejects_unknown_report(api_client, upload_dir):
+    report = SimpleUploadedFile('report.json', b'{"foo": 1}')
+    response = api_client.post(URL, {'file': report, 'product_name': 'unknown'}, format='multipart')
+
+    assert response.status_code == 400
+    assert not list(upload_dir.iterdir())
+
+
+@pytest.mark.django_db
+def test_import_task_removes_upload_of_deleted_product(upload_dir):
+    from dojo.tasks import import_scan_task
+
+    upload_path = upload_dir / 'report.json'
+    upload_path.write_bytes(zap_report(1).read())
+
+    with pytest.raises(Product.DoesNotExist):
+        import_scan_task.apply(args=(str(upload_path), 0), throw=True)
+    assert not upload_path.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_reports_progress_per_batch():
+    product = Product.objects.create(name='progress')
+    report = zap_report(25)
+    progress = []
+
+    import_scan(report, product, scan_type='zap', batch_size=10, atomic=False, progress=progress.append)
+
+    assert [meta['imported'] for meta in progress] == [10, 20, 25]
+    assert all(0 < meta['bytes_read'] <= meta['bytes_total'] == report.size for meta in progress)
+    # Без общей транзакции пачки уже зафиксированы и видны статусу задачи
+    assert Finding.objects.filter(product=product).count() == 25
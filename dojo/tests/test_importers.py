@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from dojo.importers import ScanImportError, detect_scan_type, import_scan
+from dojo.models import Engagement, Finding, Product
+
+
+def bandit_report(count, severity='HIGH'):
+    report = {
+        'generated_at': '2024-01-01T00:00:00Z',
+        'results': [
+            {'test_id': 'B602', 'test_name': 'subprocess_popen_with_shell_equals_true',
+             'issue_severity': severity, 'issue_cwe': {'id': 78}, 'issue_text': 'shell=True',
+             'filename': f'dojo/module_{i}.py', 'line_number': i + 1}
+            for i in range(count)
+        ],
+    }
+    return SimpleUploadedFile('bandit.json', json.dumps(report).encode())
+
+
+@pytest.fixture
+def product(db):
+    return Product.objects.create(name='product')
+
+
+def test_detects_scan_type_without_consuming_upload():
+    upload = bandit_report(1)
+
+    assert detect_scan_type(upload) == 'bandit'
+    upload.seek(0)
+    assert json.loads(upload.read())['generated_at']
+
+
+def test_import_writes_findings_in_batches(product, django_assert_num_queries):
+    # Общая транзакция (2), проверка через get_or_create (4) и по INSERT на пачку из 10 находок
+    with django_assert_num_queries(2 + 4 + 3):
+        result = import_scan(bandit_report(25), product, batch_size=10)
+
+    assert result['scan_type'] == 'bandit'
+    assert result['imported'] == 25
+    finding = Finding.objects.get(product=product, line=1)
+    assert finding.severity == Finding.SEVERITY_HIGH
+    assert finding.cwe == 78
+    assert finding.engagement == Engagement.objects.get(pk=result['engagement'])
+
+
+def test_reimport_updates_by_fingerprint(product):
+    import_scan(bandit_report(5), product)
+    result = import_scan(bandit_report(5, severity='LOW'), product)
+
+    assert result['imported'] == 5
+    assert Finding.objects.filter(product=product).count() == 5
+    assert set(Finding.objects.values_list('severity', flat=True)) == {Finding.SEVERITY_LOW}
+
+
+def test_broken_report_leaves_nothing_behind(product):
+    upload = SimpleUploadedFile('bandit.json', b'{"generated_at": "x", "results": [{"test_id": "B1"}, {"')
+
+    with pytest.raises(ScanImportError):
+        import_scan(upload, product, scan_type='bandit', batch_size=1)
+
+    assert not Finding.objects.exists()
+    assert not Engagement.objects.exists()
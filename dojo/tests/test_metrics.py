@@ -0,0 +1,45 @@
+import threading
+
+from dojo import metrics
+
+
+def totals():
+    return {key: values[metrics.COUNT] for key, values in metrics.local_snapshot()}
+
+
+def record_in_thread(view):
+    thread = threading.Thread(target=metrics.record, args=(view, 'GET', 200, 0.01, 10, None))
+    thread.start()
+    thread.join()
+
+
+def test_finished_threads_are_folded():
+    before = totals()
+    shards = len(metrics._shards)
+    for _ in range(50):
+        record_in_thread('test-view')
+
+    after = totals()
+    key = ('test-view', 'GET', 200)
+    assert after[key] - before.get(key, 0) == 50
+    # Таблицы 50 завершившихся потоков не копятся
+    assert len(metrics._shards) <= shards
+
+
+def test_live_thread_keeps_its_shard():
+    started, finish = threading.Event(), threading.Event()
+
+    def work():
+        metrics.record('live-view', 'GET', 200, 0.01, None, None)
+        started.set()
+        finish.wait()
+        metrics.record('live-view', 'GET', 200, 0.01, None, None)
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    started.wait()
+    key = ('live-view', 'GET', 200)
+    assert totals()[key] == 1
+    finish.set()
+    thread.join()
+    assert totals()[key] == 2
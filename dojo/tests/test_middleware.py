@@ -0,0 +1,34 @@
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from dojo.middleware import SECURITY_HEADERS, MethodPolicy, SecurityMiddleware
+
+
+def test_security_headers_keep_view_values():
+    def view(request):
+        response = HttpResponse()
+        response['x-frame-options'] = 'SAMEORIGIN'
+        return response
+
+    response = SecurityMiddleware(view)(RequestFactory().get('/'))
+
+    assert response['X-Frame-Options'] == 'SAMEORIGIN'
+    for name, value in SECURITY_HEADERS.items():
+        if name != 'X-Frame-Options':
+            assert response[name] == value
+
+
+def test_forbidden_method_gets_security_headers():
+    response = SecurityMiddleware(lambda request: HttpResponse())(RequestFactory().patch('/api/vulnerabilities/'))
+
+    assert response.status_code == 403
+    assert response['X-Content-Type-Options'] == 'nosniff'
+
+
+def test_method_policy_matches_whole_segments():
+    policy = MethodPolicy({'/api/': ('GET',), '/api/admin/': ('POST',)})
+
+    assert policy.allowed('/api/vulnerabilities/') == {'GET'}
+    assert policy.allowed('/api/admin/users/') == {'POST'}
+    assert policy.allowed('/apis/') is None
+    assert policy.allowed('/api') is None
@@ -0,0 +1,41 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from dojo.tests.test_vulnerabilities import URL, seed_findings
+
+
+def test_cursor_pages_cover_all_findings_without_offset(api_client, engagement):
+    seed_findings(engagement, 60)
+
+    seen = []
+    url = f'{URL}?page_size=25'
+    while url:
+        with CaptureQueriesContext(connection) as queries:
+            page = api_client.get(url).json()
+        # Следующая страница - условие по id, а не OFFSET
+        assert not any('OFFSET' in query['sql'] for query in queries.captured_queries)
+        seen.extend(item['id'] for item in page['results'])
+        url = page['next']
+
+    assert seen == sorted(seen, reverse=True)
+    assert len(seen) == len(set(seen)) == 60
+
+
+def test_sparse_fieldset_limits_output_and_columns(api_client, engagement):
+    seed_findings(engagement, 3)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(URL, {'fields': 'id,severity,product_name'})
+
+    assert response.status_code == 200
+    assert set(response.json()['results'][0]) == {'id', 'severity', 'product_name'}
+    page_query = queries.captured_queries[-1]['sql']
+    assert '"dojo_finding"."description"' not in page_query
+    assert '"dojo_product"."name"' in page_query
+
+
+def test_unknown_field_is_rejected(api_client, engagement):
+    response = api_client.get(URL, {'fields': 'id,password'})
+
+    assert response.status_code == 400
+    assert 'password' in response.json()['fields']
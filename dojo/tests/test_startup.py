@@ -0,0 +1,26 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from dojo.management.commands.startup import STATIC_MARKER
+
+
+@pytest.mark.django_db
+def test_runtime_collectstatic_writes_marker(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path / 'static'
+    # Сжатие и манифест здесь не проверяются, а занимают большую часть времени
+    settings.STORAGES = {**settings.STORAGES, 'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    }}
+    settings.STARTUP_STAMP_FILE = tmp_path / 'stamp.json'
+    settings.STARTUP_STAMP_FILE.write_text(json.dumps({'migrations': [], 'static': 'build-1'}))
+
+    call_command('startup', timeout=1, stdout=StringIO())
+    assert (settings.STATIC_ROOT / STATIC_MARKER).read_text() == 'build-1'
+
+    # Повторный запуск того же образа статику не собирает
+    output = StringIO()
+    call_command('startup', timeout=1, stdout=output)
+    assert 'skipping collectstatic' in output.getvalue()
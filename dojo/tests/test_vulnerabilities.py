@@ -0,0 +1,58 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from dojo.api.pagination import FindingCursorPagination
+from dojo.models import Finding
+
+URL = '/api/vulnerabilities/'
+
+
+def seed_findings(engagement, count):
+    Finding.objects.bulk_create(
+        (Finding(product=engagement.product, engagement=engagement, title=f'Finding {i}',
+                 severity=Finding.SEVERITY_HIGH, scanner='test', fingerprint=f'{i:016x}')
+         for i in range(count)),
+        batch_size=5000
+    )
+
+
+def test_list_query_count_does_not_depend_on_rows(api_client, engagement, django_assert_num_queries):
+    seed_findings(engagement, 10000)
+
+    # Валидатор ETag (агрегат по выборке) и страница с продуктом и проверкой через JOIN
+    with django_assert_num_queries(2):
+        response = api_client.get(URL, {'product': engagement.product_id, 'page_size': 1000})
+
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert len(results) == FindingCursorPagination.max_page_size
+    assert results[0]['product_name'] == 'product'
+    assert results[0]['engagement_name'] == 'engagement'
+
+
+def test_next_page_reuses_cached_validator(api_client, engagement):
+    seed_findings(engagement, 10000)
+    first = api_client.get(URL, {'page_size': 1000}).json()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(first['next'])
+
+    # Валидатор выборки уже в кеше: остается только запрос страницы
+    assert response.status_code == 200
+    assert len(queries) == 1
+
+
+def test_etag_changes_when_product_is_renamed(api_client, engagement, django_capture_on_commit_callbacks):
+    seed_findings(engagement, 10)
+    etag = api_client.get(URL)['ETag']
+    assert api_client.get(URL, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    # Находки не изменились, но в ответе есть имя продукта
+    with django_capture_on_commit_callbacks(execute=True):
+        engagement.product.name = 'renamed'
+        engagement.product.save()
+
+    response = api_client.get(URL, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert response.json()['results'][0]['product_name'] == 'renamed'
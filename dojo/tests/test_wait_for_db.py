@@ -0,0 +1,41 @@
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from dojo.management.commands.wait_for_db import Command
+
+
+class FakeProbe:
+    retry_errors = (ConnectionError,)
+    fatal_errors = (PermissionError,)
+
+    def __init__(self, name, error=None):
+        self.name = name
+        self.error = error
+
+    def check(self):
+        if self.error:
+            raise self.error
+
+
+def test_fatal_error_stops_waiting_for_slow_services(monkeypatch):
+    # Первым запущен сервис, который так и не поднимется
+    probes = [FakeProbe('database', ConnectionError('refused')), FakeProbe('cache', PermissionError('auth'))]
+    monkeypatch.setattr(Command, 'probes', lambda self, options: probes)
+
+    started = time.monotonic()
+    with pytest.raises(CommandError, match='cache: auth'):
+        call_command('wait_for_db', timeout=30, stdout=StringIO())
+    assert time.monotonic() - started < 5
+
+
+def test_ready_services(monkeypatch):
+    monkeypatch.setattr(Command, 'probes', lambda self, options: [FakeProbe('database'), FakeProbe('cache')])
+    output = StringIO()
+
+    call_command('wait_for_db', timeout=1, stdout=output)
+
+    assert 'database ready' in output.getvalue() and 'cache ready' in output.getvalue()
+    assert 'All services available' in output.getvalue()
@@ -6,6 +6,7 @@ from django.urls import path, include
 from django.views.decorators.http import require_http_methods
 from django.http import HttpResponseForbidden
 from dojo import views
+from dojo.health import views as health_views
 
 def admin_method_check(request):
     """Проверка разрешенных HTTP методов для admin"""
@@ -15,7 +16,8 @@ def admin_method_check(request):
 
 urlpatterns = [
     path('', views.index, name='home'),
-    path('health/', views.health, name='health'),
+    path('health/', include('dojo.health.urls')),
+    path('metrics', health_views.metrics, name='metrics'),
     path('admin/login/', admin_method_check, name='admin_login'),
     path('admin/', admin.site.urls),
     path('api/', include('dojo.api.urls')),
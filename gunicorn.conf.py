@@ -0,0 +1,80 @@
+"""
+Gunicorn configuration for Defect Dojo.
+
+Все параметры задаются переменными окружения GUNICORN_*. Приложение
+загружается в мастере до fork (preload), и воркеры делят импортированный
+код через copy-on-write. SIGHUP мягко перезапускает воркеров с новой
+конфигурацией; новый код с preload подхватывает только новый мастер
+(USR2, затем QUIT старому) или перезапуск контейнера.
+"""
+import os
+import shutil
+
+from dojo.cpu import gunicorn_workers
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Запросы ждут базу и Redis, поэтому воркер - процесс с потоками.
+# По умолчанию 2 x ядра + 1 по квоте контейнера, не больше 8 (см. dojo.cpu)
+workers = gunicorn_workers()
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+# Больше keepalive_timeout upstream в nginx (60s): соединение закрывает nginx,
+# а не gunicorn посреди отправки следующего запроса
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 75))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Плановый перезапуск воркеров ограничивает рост памяти; jitter разносит их во времени
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Heartbeat воркеров в tmpfs, а не на overlay-диске контейнера
+worker_tmp_dir = os.environ.get('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+# Пустое значение отключает журнал запросов (нагрузочные замеры)
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+forwarded_allow_ips = os.environ.get('GUNICORN_FORWARDED_ALLOW_IPS', '*')
+
+# Снимки метрик воркеров: /metrics любого воркера отдает сумму по всем.
+# Конфигурация читается до загрузки приложения, поэтому настройки Django видят значение
+METRICS_DIR = os.environ.setdefault(
+    'METRICS_DIR', os.path.join(worker_tmp_dir or '/tmp', f'dojo-metrics-{os.getpid()}')
+)
+
+
+def on_starting(server):
+    if METRICS_DIR:
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+        os.makedirs(METRICS_DIR)
+
+
+def on_exit(server):
+    if METRICS_DIR:
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+
+
+def post_fork(server, worker):
+    # Соединения, открытые мастером при загрузке, не должны делиться между воркерами
+    from django.db import connections
+    connections.close_all()
+
+    from dojo import metrics
+    metrics.start_flusher()
+
+
+def worker_exit(server, worker):
+    from dojo import metrics
+    metrics.flush()
+
+
+def child_exit(server, worker):
+    # Счетчики завершенного воркера не должны пропасть из суммы
+    if METRICS_DIR:
+        from dojo import metrics
+        metrics.retire(METRICS_DIR, worker.pid)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Нагрузочное сравнение режимов сервера приложения
+
+Запускает Defect Dojo по очереди в режимах runserver (однопоточный, как
+раньше в docker-entrypoint.sh), gunicorn (WSGI, gunicorn.conf.py) и
+uvicorn (ASGI: gunicorn с воркерами uvicorn и dojo.asgi), нагружает
+каждый заданным числом параллельных соединений keep-alive и печатает
+пропускную способность и перцентили задержки.
+
+Нагрузку создает один asyncio-цикл, поэтому тысяча соединений не требует
+тысячи потоков. Настройки базы и прочего берутся из текущего окружения,
+как у manage.py. Пример:
+  python scripts/app-server-benchmark.py --path /api/vulnerabilities/ \\
+      --header "Authorization: Token <token>" --concurrency 1000 --duration 20
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+MODES = {
+    'runserver': lambda python, bind: [
+        python, 'manage.py', 'runserver', bind, '--noreload', '--nothreading', '--verbosity=0',
+    ],
+    'gunicorn': lambda python, bind: [
+        python, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', bind, 'dojo.wsgi:application',
+    ],
+    'uvicorn': lambda python, bind: [
+        python, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', bind,
+        '-k', 'uvicorn.workers.UvicornWorker', 'dojo.asgi:application',
+    ],
+}
+
+REQUEST_TIMEOUT = 30
+
+
+class ServerClosed(Exception):
+    """Сервер закрыл соединение keep-alive до ответа"""
+
+
+async def read_response(reader):
+    """Статус и признак закрытия соединения; тело вычитывается и отбрасывается"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    if not head:
+        raise ServerClosed()
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip().lower()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif status not in (204, 304):
+        await reader.read()
+        return status, True
+    return status, headers.get('connection') == 'close'
+
+
+async def client(host, port, request, deadline, latencies, errors, reconnects):
+    """
+    Одно соединение: запросы подряд по keep-alive.
+
+    Обрыв уже использованного соединения (воркер перезапущен по
+    max_requests) повторяется по новому соединению, как это делает nginx,
+    и считается переподключением, а не ошибкой. Время установки
+    соединения входит в задержку запроса.
+    """
+    loop = asyncio.get_running_loop()
+    reader = writer = None
+    reused = False
+    while loop.time() < deadline:
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), REQUEST_TIMEOUT)
+                reused = False
+            writer.write(request)
+            status, close = await asyncio.wait_for(read_response(reader), REQUEST_TIMEOUT)
+        except (ServerClosed, asyncio.IncompleteReadError, ConnectionError) as e:
+            (reconnects if reused else errors).append(type(e).__name__)
+            writer, reused = close_writer(writer), False
+            continue
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            errors.append(type(e).__name__)
+            writer, reused = close_writer(writer), False
+            continue
+
+        if close:
+            writer = close_writer(writer)
+        reused = writer is not None
+        if status >= 500:
+            errors.append(status)
+            continue
+        latencies.append(time.perf_counter() - start)
+    close_writer(writer)
+
+
+def close_writer(writer):
+    if writer is not None:
+        writer.close()
+    return None
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def load(host, port, path, headers, concurrency, duration):
+    lines = [f'GET {path} HTTP/1.1', f'Host: {host}:{port}']
+    lines.extend(f'{name}: {value}' for name, value in headers.items())
+    request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    latencies, errors, reconnects = [], [], []
+    deadline = asyncio.get_running_loop().time() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, request, deadline, latencies, errors, reconnects)
+        for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'reconnects': len(reconnects),
+        'rps': len(latencies) / elapsed,
+        'p50': percentile(latencies, 0.50) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def wait_until_ready(host, port, path, headers, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = await load(host, port, path, headers, 1, 0.01)
+        if result['requests']:
+            return True
+        await asyncio.sleep(0.2)
+    return False
+
+
+def run_mode(mode, args, headers):
+    bind = f'{args.host}:{args.port}'
+    env = dict(os.environ, PYTHONUNBUFFERED='1', GUNICORN_ACCESSLOG='')
+    server = subprocess.Popen(
+        MODES[mode](sys.executable, bind), cwd=ROOT_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not asyncio.run(wait_until_ready(args.host, args.port, args.path, headers)):
+            print(f"❌ {mode}: сервер не ответил на {bind}{args.path}")
+            return None
+        # Прогрев: импорт модулей, соединения с базой и кешем в воркерах
+        asyncio.run(load(args.host, args.port, args.path, headers, min(args.concurrency, 16), 2))
+        return asyncio.run(load(args.host, args.port, args.path, headers, args.concurrency, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочное сравнение runserver, gunicorn (WSGI) и uvicorn (ASGI)')
+    parser.add_argument('--path', default='/health/', help='Запрашиваемый путь (по умолчанию /health/)')
+    parser.add_argument('--header', action='append', default=[], help='Заголовок "Name: value", можно несколько')
+    parser.add_argument('--concurrency', type=int, default=16, help='Параллельных соединений (по умолчанию 16)')
+    parser.add_argument('--duration', type=float, default=10, help='Секунд нагрузки на режим (по умолчанию 10)')
+    parser.add_argument('--modes', default='runserver,gunicorn,uvicorn', help='Режимы через запятую')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    headers = dict(header.split(':', 1) for header in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+
+    print(f"🚀 GET {args.path}: {args.concurrency} соединений, {args.duration:g} с на режим")
+    print(f"{'mode':<10} {'req/s':>9} {'p50, ms':>9} {'p99, ms':>9} {'requests':>9} {'errors':>7} {'reconnects':>10}")
+    for mode in args.modes.split(','):
+        result = run_mode(mode, args, headers)
+        if result is not None:
+            print(f"{mode:<10} {result['rps']:>9.1f} {result['p50']:>9.2f} {result['p99']:>9.2f} "
+                  f"{result['requests']:>9} {result['errors']:>7} {result['reconnects']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк Security Gateway
+
+Команды:
+  stream     - потоковый разбор отчета Semgrep против json.load (по умолчанию)
+  aggregate  - поэлементная агрегация счетчиков против пакетной
+  run        - набор замеров: синтетические отчеты Bandit, Semgrep, ZAP, Nuclei,
+               TruffleHog и Checkov, разбор каждым анализатором и полный прогон
+               SecurityGateway; результаты дописываются в JSON-файл истории
+  compare    - сравнение последнего прогона из истории с предыдущим
+
+Каждый замер выполняется в отдельном процессе, чтобы пиковый RSS был честным.
+Отчеты генерируются локально, сеть не нужна.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from gateway_parsers import SEVERITY_KEYS, SemgrepParser, aggregate_severities, parse_report
+from gateway_stream import iter_path, EACH
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+SEVERITIES = ('ERROR', 'WARNING', 'INFO')
+DEFAULT_HISTORY = '.gateway-benchmark-history.json'
+# Рост времени или памяти сверх этой доли считается регрессией
+DEFAULT_THRESHOLD = 0.10
+# Разница времени меньше этой (в секундах) считается шумом
+DEFAULT_MIN_SECONDS = 0.05
+
+
+def write_report(path: Path, head: str, record, findings: int, tail: str):
+    """Записывает отчет по одной записи, не держа его в памяти"""
+    with open(path, 'w') as f:
+        f.write(head)
+        for i in range(findings):
+            if i:
+                f.write(',')
+            f.write(record(i))
+        f.write(tail)
+
+
+def write_semgrep_report(path: Path, findings: int):
+    write_report(
+        path, '{"errors": [], "paths": {"scanned": []}, "results": [',
+        lambda i: (
+            f'{{"check_id": "python.lang.security.rule-{i % 50}", "path": "dojo/module_{i % 1000}.py", '
+            f'"start": {{"line": {i % 500 + 1}, "col": 1}}, "end": {{"line": {i % 500 + 2}, "col": 1}}, '
+            f'"extra": {{"message": "Potential security issue detected in this code path", '
+            f'"severity": "{SEVERITIES[i % len(SEVERITIES)]}", "metadata": {{"cwe": ["CWE-{i % 100}"]}}}}}}'
+        ),
+        findings, '], "version": "1.0.0"}'
+    )
+
+
+def write_bandit_report(path: Path, findings: int):
+    levels = ('HIGH', 'MEDIUM', 'LOW')
+    write_report(
+        path, '{"generated_at": "2024-01-01T00:00:00Z", "errors": [], "results": [',
+        lambda i: (
+            f'{{"code": "subprocess.call(cmd, shell=True)", "filename": "dojo/module_{i % 1000}.py", '
+            f'"issue_confidence": "HIGH", "issue_cwe": {{"id": {i % 100}, "link": ""}}, '
+            f'"issue_severity": "{levels[i % 3]}", "issue_text": "Potential security issue", '
+            f'"line_number": {i + 1}, "test_id": "B{600 + i % 20}", "test_name": "synthetic"}}'
+        ),
+        findings, '], "metrics": {}}'
+    )
+
+
+def write_zap_report(path: Path, findings: int):
+    risks = ('High', 'Medium', 'Low')
+    write_report(
+        path, '{"alerts": [',
+        lambda i: (
+            f'{{"pluginid": "{90004 if i % 97 == 0 else 10000 + i % 50}", '
+            f'"name": "Synthetic alert {i % 50}", "risk": "{risks[i % 3]}", '
+            f'"url": "https://app.example/api/items/{i}?page={i % 7}"}}'
+        ),
+        findings, ']}'
+    )
+
+
+def write_nuclei_report(path: Path, findings: int):
+    levels = ('critical', 'high', 'medium', 'low')
+    write_report(
+        path, '[',
+        lambda i: (
+            f'{{"template-id": "synthetic-template-{i % 80}", '
+            f'"info": {{"name": "Synthetic template", "severity": "{levels[i % 4]}"}}, '
+            f'"matched-at": "https://app.example/path/{i}"}}'
+        ),
+        findings, ']'
+    )
+
+
+def write_trufflehog_report(path: Path, findings: int):
+    write_report(
+        path, '[',
+        lambda i: (
+            f'{{"DetectorName": "AWS", "Verified": false, "SourceMetadata": {{"Data": '
+            f'{{"Filesystem": {{"file": "config/settings_{i % 1000}.env", "line": {i + 1}}}}}}}}}'
+        ),
+        findings, ']'
+    )
+
+
+def write_checkov_report(path: Path, findings: int):
+    levels = ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW')
+    write_report(
+        path, '{"check_type": "terraform", "results": {"terraform": {"failed_checks": [',
+        lambda i: (
+            f'{{"check_id": "CKV_AWS_{i % 100}", "severity": "{levels[i % 4]}", '
+            f'"file_path": "/infra/main_{i % 50}.tf", "resource": "aws_s3_bucket.bucket_{i}"}}'
+        ),
+        findings, ']}}, "summary": {}}'
+    )
+
+
+# Генераторы синтетических отчетов по сканерам
+GENERATORS = {
+    'bandit': write_bandit_report,
+    'semgrep': write_semgrep_report,
+    'zap': write_zap_report,
+    'nuclei': write_nuclei_report,
+    'trufflehog': write_trufflehog_report,
+    'checkov': write_checkov_report,
+}
+
+
+def count_json_load(path: Path):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return sum(1 for result in data.get('results', [])
+               if result.get('extra', {}).get('severity', 'WARNING'))
+
+
+def count_stream(path: Path):
+    with open(path, 'r') as f:
+        return sum(1 for result in iter_path(f, ('results', EACH))
+                   if result.get('extra', {}).get('severity', 'WARNING'))
+
+
+def count_analyzer(scanner: str):
+    def count(path: Path):
+        tally = parse_report((scanner, path))
+        if tally['error']:
+            raise RuntimeError(tally['error'])
+        return sum(tally[key] for key in SEVERITY_KEYS)
+    return count
+
+
+def count_gateway(workdir: Path):
+    """Полный прогон SecurityGateway в рабочей директории с all-results/"""
+    import security_gateway
+
+    os.chdir(workdir)
+    report = security_gateway.run(cache_dir='', fingerprints_out='')
+    return report['total_vulnerabilities']
+
+
+MODES = {
+    'json.load': count_json_load,
+    'stream': count_stream,
+    'e2e': count_gateway,
+}
+MODES.update((scanner, count_analyzer(scanner)) for scanner in GENERATORS)
+
+
+def measure(mode: str, path: Path):
+    """Выполняется в дочернем процессе, чтобы пиковый RSS был честным"""
+    start = time.perf_counter()
+    findings = MODES[mode](path)
+    elapsed = time.perf_counter() - start
+    # Пул процессов шлюза учитывается через RUSAGE_CHILDREN
+    peak_rss_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                      resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print(json.dumps({
+        "findings": findings,
+        "seconds": elapsed,
+        "peak_rss_kb": peak_rss_kb,
+    }))
+
+
+def run_mode(mode: str, path: Path):
+    output = subprocess.run(
+        [sys.executable, __file__, '--measure', mode, str(path)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def benchmark_stream(sizes):
+    print(f"{'находок':>10} {'размер, МБ':>11} {'режим':>10} {'время, с':>9} {'пик RSS, МБ':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for findings in sizes:
+            report = Path(tmp) / f"semgrep-{findings}.json"
+            write_semgrep_report(report, findings)
+            size_mb = report.stat().st_size / 2 ** 20
+            for mode in ('json.load', 'stream'):
+                result = run_mode(mode, report)
+                print(f"{findings:>10} {size_mb:>11.1f} {mode:>10} "
+                      f"{result['seconds']:>9.2f} {result['peak_rss_kb'] / 1024:>12.1f}")
+            report.unlink()
+
+
+def aggregate_per_item(severities):
+    """Прежний способ: цепочка if/elif и обновление словаря на каждую находку"""
+    report = dict.fromkeys(SEVERITY_KEYS, 0)
+    for severity in severities:
+        if severity == 'ERROR':
+            report['high_vulnerabilities'] += 1
+        elif severity == 'WARNING':
+            report['medium_vulnerabilities'] += 1
+        elif severity == 'INFO':
+            report['low_vulnerabilities'] += 1
+    return report
+
+
+def aggregate_bulk(severities):
+    """Пакетный подсчет через Counter и таблицу уровней парсера"""
+    raw_counts = Counter(severities)
+    return dict(zip(SEVERITY_KEYS, aggregate_severities(raw_counts, SemgrepParser.severity_map)))
+
+
+def benchmark_aggregation(findings: int):
+    """
+    Сравнение агрегации на уже разобранных записях.
+
+    Извлечение поля критичности одинаково для обоих способов и измеряется
+    отдельно, чтобы сравнивалась именно стоимость подсчета.
+    """
+    results = [
+        {"check_id": "rule", "extra": {"severity": SEVERITIES[i % len(SEVERITIES)]}}
+        for i in range(findings)
+    ]
+    parser = SemgrepParser(Path('semgrep-results.json'))
+    start = time.perf_counter()
+    severities = list(parser.severities(results))
+    print(f"{'extract':>10}: {time.perf_counter() - start:.3f} с")
+
+    timings = {}
+    for name, aggregate in (('per-item', aggregate_per_item), ('bulk', aggregate_bulk)):
+        start = time.perf_counter()
+        totals = aggregate(severities)
+        timings[name] = time.perf_counter() - start
+        print(f"{name:>10}: {timings[name]:.3f} с  {totals}")
+    print(f"Пакетная агрегация: {timings['bulk'] / timings['per-item']:.0%} времени поэлементной")
+
+
+def best_of(mode: str, path: Path, repeat: int) -> dict:
+    """Лучший из нескольких замеров: шум CI только замедляет прогон"""
+    results = [run_mode(mode, path) for _ in range(repeat)]
+    best = min(results, key=lambda result: result['seconds'])
+    return {
+        "findings": best['findings'],
+        "seconds": round(best['seconds'], 4),
+        "peak_rss_mb": round(max(result['peak_rss_kb'] for result in results) / 1024, 1),
+        "findings_per_sec": round(best['findings'] / best['seconds']) if best['seconds'] else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPTS_DIR,
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: Path) -> dict:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"runs": []}
+
+
+def benchmark_suite(sizes, scanners, repeat: int, end_to_end: bool, history_path: Path):
+    """
+    Замеры по анализаторам и полного прогона шлюза.
+
+    Для каждого размера генерируется по отчету на сканер с указанным числом
+    находок; полный прогон разбирает их все сразу.
+    """
+    results = []
+    print(f"{'цель':>10} {'находок':>10} {'время, с':>9} {'пик RSS, МБ':>12} {'находок/с':>11}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            results_dir = Path(tmp) / 'all-results'
+            results_dir.mkdir()
+            targets = []
+            for scanner in scanners:
+                report = results_dir / f"{scanner}-results.json"
+                GENERATORS[scanner](report, size)
+                targets.append((scanner, report))
+            if end_to_end:
+                targets.append(('e2e', Path(tmp)))
+
+            for target, path in targets:
+                result = {"target": target, "size": size, **best_of(target, path, repeat)}
+                results.append(result)
+                print(f"{target:>10} {result['findings']:>10} {result['seconds']:>9.3f} "
+                      f"{result['peak_rss_mb']:>12.1f} {result['findings_per_sec'] or 0:>11}")
+
+    history = load_history(history_path)
+    history['runs'].append({
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    })
+    with open(history_path, 'w') as f:
+        json.dump(history, f, indent=2)
+    print(f"💾 Результаты добавлены в {history_path} (прогонов: {len(history['runs'])})")
+
+
+def compare_runs(history_path: Path, baseline_index: int, threshold: float,
+                 min_seconds: float = DEFAULT_MIN_SECONDS) -> int:
+    """Сравнение последнего прогона с базовым; возвращает число регрессий"""
+    runs = load_history(history_path)['runs']
+    if len(runs) < 2:
+        print(f"⚠️ В {history_path} меньше двух прогонов, сравнивать не с чем")
+        return 0
+
+    current, baseline = runs[-1], runs[baseline_index]
+    previous = {(result['target'], result['size']): result for result in baseline['results']}
+    print(f"Сравнение {current['timestamp']} ({current['commit']}) "
+          f"с {baseline['timestamp']} ({baseline['commit']}), порог {threshold:.0%}")
+    print(f"{'цель':>10} {'находок':>10} {'время':>8} {'память':>8}")
+
+    regressions = 0
+    for result in current['results']:
+        before = previous.get((result['target'], result['size']))
+        if before is None:
+            continue
+        changes = [result[metric] / before[metric] - 1 if before[metric] else 0.0
+                   for metric in ('seconds', 'peak_rss_mb')]
+        slower = changes[0] > threshold and result['seconds'] - before['seconds'] >= min_seconds
+        regressed = slower or changes[1] > threshold
+        regressions += regressed
+        print(f"{result['target']:>10} {result['size']:>10} {changes[0]:>+8.1%} {changes[1]:>+8.1%}"
+              f"{'  ⚠️ регрессия' if regressed else ''}")
+
+    if regressions:
+        print(f"🚨 Регрессий: {regressions}")
+    else:
+        print("✅ Регрессий нет")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--measure', nargs=2, metavar=('MODE', 'FILE'), help=argparse.SUPPRESS)
+    commands = parser.add_subparsers(dest='command')
+
+    stream = commands.add_parser('stream', help='Потоковый разбор против json.load')
+    stream.add_argument('--findings', type=int, nargs='+', default=[10000, 100000, 500000],
+                        help='Количество находок в синтетических отчетах')
+
+    aggregate = commands.add_parser('aggregate', help='Сравнение агрегации счетчиков')
+    aggregate.add_argument('findings', type=int, help='Количество находок')
+
+    suite = commands.add_parser('run', help='Набор замеров с записью в историю')
+    suite.add_argument('--findings', type=int, nargs='+', default=[1000, 10000, 100000],
+                       help='Количество находок в каждом отчете (до 5000000)')
+    suite.add_argument('--scanners', nargs='+', choices=list(GENERATORS), default=list(GENERATORS),
+                       help='Сканеры, для которых генерируются отчеты')
+    suite.add_argument('--repeat', type=int, default=1, help='Повторов каждого замера (берется лучший)')
+    suite.add_argument('--no-e2e', action='store_true', help='Не запускать полный прогон SecurityGateway')
+    suite.add_argument('--history', type=Path, default=Path(DEFAULT_HISTORY), help='Файл истории')
+
+    compare = commands.add_parser('compare', help='Поиск регрессий в истории замеров')
+    compare.add_argument('--history', type=Path, default=Path(DEFAULT_HISTORY), help='Файл истории')
+    compare.add_argument('--against', type=int, default=-2, metavar='INDEX',
+                         help='Индекс базового прогона в истории (по умолчанию предыдущий)')
+    compare.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                         help='Допустимый рост времени и памяти (доля)')
+    compare.add_argument('--min-seconds', type=float, default=DEFAULT_MIN_SECONDS,
+                         help='Меньший прирост времени в секундах не считается регрессией')
+
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure[0], Path(args.measure[1]))
+    elif args.command == 'aggregate':
+        benchmark_aggregation(args.findings)
+    elif args.command == 'run':
+        benchmark_suite(args.findings, args.scanners, args.repeat, not args.no_e2e, args.history)
+    elif args.command == 'compare':
+        sys.exit(1 if compare_runs(args.history, args.against, args.threshold, args.min_seconds) else 0)
+    else:
+        benchmark_stream(getattr(args, 'findings', None) or [10000, 100000, 500000])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Базовый набор находок для Security Gateway
+
+Отпечатки уникальных находок прогона сохраняются в компактный файл:
+16-байтовый заголовок и отсортированный массив 64-битных отпечатков
+(little-endian, по 8 байт на находку). Файл отображается в память через
+mmap и читается без преобразования в объекты Python, а сравнение с
+текущими находками идет слиянием отсортированных последовательностей:
+курсор по базовому набору только движется вперед.
+"""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List
+
+from gateway_parsers import SEVERITY_KEYS
+
+MAGIC = b'SGFP'
+FORMAT_VERSION = 1
+# Магия, версия, резерв и число отпечатков; данные после заголовка выровнены на 8 байт
+HEADER = struct.Struct('<4sHHQ')
+
+
+class BaselineError(Exception):
+    """Файл базового набора поврежден или имеет другой формат"""
+
+
+def write_fingerprints(path: Path, by_severity: List[list]):
+    """Сохраняет отпечатки всех уровней одним отсортированным массивом"""
+    fingerprints = array('Q', sorted(set().union(*by_severity)))
+    if sys.byteorder != 'little':
+        fingerprints.byteswap()
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(fingerprints)))
+            fingerprints.tofile(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(fingerprints)
+
+
+class Baseline:
+    """Отсортированные отпечатки базового прогона, отображенные в память"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise BaselineError(f"{self.path}: файл короче заголовка")
+            magic, version, _, self.count = HEADER.unpack(header)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise BaselineError(f"{self.path}: неизвестный формат")
+            if os.fstat(f.fileno()).st_size != HEADER.size + 8 * self.count:
+                raise BaselineError(f"{self.path}: размер не совпадает с заголовком")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+
+        if self._mmap is None:
+            self.fingerprints = ()
+        elif sys.byteorder == 'little':
+            self.fingerprints = memoryview(self._mmap)[HEADER.size:].cast('Q')
+        else:
+            self.fingerprints = array('Q', self._mmap[HEADER.size:])
+            self.fingerprints.byteswap()
+
+    def close(self):
+        if self._mmap is not None:
+            if isinstance(self.fingerprints, memoryview):
+                self.fingerprints.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def new_fingerprints(self, current: List[int]) -> List[int]:
+        """
+        Отпечатки из ``current``, которых нет в базовом наборе.
+
+        ``current`` должен быть отсортирован и не содержать повторов. Наборы
+        соседних прогонов почти совпадают, поэтому сначала проверяется
+        очередной элемент базового набора, и лишь при расхождении курсор
+        догоняет текущий отпечаток двоичным поиском.
+        """
+        baseline = self.fingerprints
+        size = len(baseline)
+        new = []
+        position = 0
+        for fingerprint in current:
+            if position < size and baseline[position] == fingerprint:
+                position += 1
+                continue
+            position = bisect_left(baseline, fingerprint, position)
+            if position < size and baseline[position] == fingerprint:
+                position += 1
+            else:
+                new.append(fingerprint)
+        return new
+
+
+def diff_against_baseline(baseline: Baseline, by_severity: List[list]) -> Dict[str, int]:
+    """Число новых относительно базового набора находок по уровням"""
+    new = {
+        key: len(baseline.new_fingerprints(sorted(fingerprints)))
+        for key, fingerprints in zip(SEVERITY_KEYS, by_severity)
+    }
+    new['total_vulnerabilities'] = sum(new[key] for key in SEVERITY_KEYS)
+    new['baseline_findings'] = baseline.count
+    return new
@@ -0,0 +1,163 @@
+"""
+Кеш итогов разбора отчетов для Security Gateway
+
+Итог разбора файла хранится под ключом из пути, SHA-256 содержимого,
+сканера, версии его парсера и того, собирались ли отпечатки: JSON с
+итогом и двоичный файл с отпечатками находок. Чтобы не хешировать неизменившиеся файлы, для каждого пути
+запоминаются размер и mtime: при их совпадении хеш берется из индекса.
+Размер кеша ограничен, при переполнении удаляются давно не использованные
+записи.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+# Версия формата кеша; при изменении все старые записи игнорируются
+CACHE_FORMAT = 2
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, write):
+    """Запись через временный файл, чтобы прерванный запуск не испортил кеш"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _write_json_atomic(path: Path, data):
+    _write_atomic(path, lambda f: f.write(json.dumps(data).encode()))
+
+
+def _write_blobs_atomic(path: Path, blobs):
+    """Список байтовых строк: число, длины и затем сами данные"""
+    def write(f):
+        f.write(struct.pack(f'<I{len(blobs)}Q', len(blobs), *map(len, blobs)))
+        for blob in blobs:
+            f.write(blob)
+    _write_atomic(path, write)
+
+
+def _read_blobs(path: Path):
+    with open(path, 'rb') as f:
+        count, = struct.unpack('<I', f.read(4))
+        lengths = struct.unpack(f'<{count}Q', f.read(8 * count))
+        return [f.read(length) for length in lengths]
+
+
+class ResultCache:
+    """Дисковый кеш итогов разбора с вытеснением по размеру"""
+
+    def __init__(self, directory: Path, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.entries_dir = self.directory / 'entries'
+        self.index_path = self.directory / 'index.json'
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            if index.get('format') == CACHE_FORMAT:
+                return index
+        except (OSError, ValueError):
+            pass
+        return {"format": CACHE_FORMAT, "files": {}, "entries": {}}
+
+    def _content_hash(self, path: Path) -> str:
+        """Хеш содержимого; размер и mtime служат быстрой предпроверкой"""
+        stat = path.stat()
+        known = self._index['files'].get(str(path))
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['sha256']
+
+        sha256 = file_sha256(path)
+        self._index['files'][str(path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+        }
+        return sha256
+
+    def key(self, scanner: str, path: Path, parser_version: int, fingerprints: bool = True) -> str:
+        # Путь входит в ключ, так как сообщения итога ссылаются на файл
+        raw_key = f"{scanner}:{parser_version}:{int(fingerprints)}:{path}:{self._content_hash(path)}"
+        return hashlib.sha256(raw_key.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._index['entries'].get(key)
+        if entry is not None:
+            try:
+                with open(self.entries_dir / f"{key}.json", 'r') as f:
+                    tally = json.load(f)
+                # Итог без отпечатков хранит fingerprints: null и не имеет файла .fp
+                if 'fingerprints' not in tally:
+                    tally['fingerprints'] = _read_blobs(self.entries_dir / f"{key}.fp")
+            except (OSError, ValueError, struct.error):
+                del self._index['entries'][key]
+            else:
+                entry['last_used'] = time.time()
+                self.hits += 1
+                return tally
+        self.misses += 1
+        return None
+
+    def put(self, key: str, tally: dict):
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        entry_path = self.entries_dir / f"{key}.json"
+        fingerprints_path = self.entries_dir / f"{key}.fp"
+        size = 0
+        if tally['fingerprints'] is None:
+            _write_json_atomic(entry_path, tally)
+        else:
+            _write_blobs_atomic(fingerprints_path, tally['fingerprints'])
+            _write_json_atomic(entry_path, {k: v for k, v in tally.items() if k != 'fingerprints'})
+            size = fingerprints_path.stat().st_size
+        self._index['entries'][key] = {
+            "bytes": entry_path.stat().st_size + size,
+            "last_used": time.time(),
+        }
+
+    def _evict(self):
+        """Удаление давно не использованных записей сверх лимита размера"""
+        entries = self._index['entries']
+        total = sum(entry['bytes'] for entry in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= entries.pop(key)['bytes']
+            for suffix in ('.json', '.fp'):
+                try:
+                    (self.entries_dir / f"{key}{suffix}").unlink()
+                except OSError:
+                    pass
+
+    def save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._evict()
+        # Предпроверка нужна только для путей, существующих сейчас
+        self._index['files'] = {
+            path: known for path, known in self._index['files'].items() if Path(path).exists()
+        }
+        _write_json_atomic(self.index_path, self._index)
@@ -0,0 +1,57 @@
+"""
+Дедупликация находок по отпечаткам для Security Gateway
+
+Отпечатки собираются в хеш-множество, а операции над ним выполняются
+пакетно (разность и объединение множеств), так что время линейно по числу
+находок. Память тоже линейна: каждый уникальный отпечаток хранится как
+целое Python; при разборе отпечатки занимают 8 байт на находку, а без
+дедупликации и базового набора не собираются вовсе (см. gateway_parsers).
+
+Уровни обрабатываются от критического к низкому, поэтому находка, о которой
+сканеры сообщили с разной критичностью, учитывается один раз - по высшему.
+"""
+
+from array import array
+from typing import Dict, List, Tuple
+
+from gateway_parsers import SEVERITY_KEYS
+
+
+class FingerprintSet:
+    """Точное множество отпечатков"""
+
+    def __init__(self):
+        self._seen = set()
+
+    def add_batch(self, fingerprints) -> set:
+        """Добавляет отпечатки и возвращает ранее не встречавшиеся"""
+        new = set(fingerprints)
+        new.difference_update(self._seen)
+        self._seen.update(new)
+        return new
+
+
+def deduplicate(tallies: List[dict]) -> Tuple[Dict[str, int], List[list]]:
+    """
+    Уникальные находки по уровням для итогов всех отчетов.
+
+    Возвращает сводку для отчета и отпечатки уникальных находок по уровням
+    (каждая находка - на уровне с наивысшей критичностью).
+    """
+    store = FingerprintSet()
+    total = 0
+    unique = {}
+    by_severity = []
+    for code, key in enumerate(SEVERITY_KEYS):
+        new = []
+        for tally in tallies:
+            fingerprints = array('Q')
+            fingerprints.frombytes(tally['fingerprints'][code])
+            total += len(fingerprints)
+            new.extend(store.add_batch(fingerprints))
+        by_severity.append(new)
+        unique[key] = len(new)
+
+    unique['total_vulnerabilities'] = sum(unique[key] for key in SEVERITY_KEYS)
+    unique['duplicates'] = total - unique['total_vulnerabilities']
+    return unique, by_severity
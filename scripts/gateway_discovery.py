@@ -0,0 +1,97 @@
+"""
+Поиск отчетов сканеров для Security Gateway
+
+Дерево результатов обходится один раз, а тип каждого JSON-файла
+определяется по содержимому: ключам верхнего уровня объекта или ключам
+первого элемента массива. Имена файлов при этом не важны.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from gateway_parsers import PARSER_REGISTRY
+from gateway_stream import JsonStream, ReadLimitExceeded
+
+# Сколько символов файла можно прочитать, чтобы определить его тип
+SNIFF_LIMIT = 1024 * 1024
+
+# Порядок разбора отчетов совпадает с порядком регистрации парсеров
+SCANNER_ORDER = tuple(PARSER_REGISTRY)
+
+
+def sniff_stream(f) -> Optional[str]:
+    """Определение сканера по началу открытого отчета (None - формат не распознан)"""
+    try:
+        for container, key in JsonStream(f, limit=SNIFF_LIMIT).iter_shape():
+            for scanner, parser_class in PARSER_REGISTRY.items():
+                signature_container, keys = parser_class.signature
+                if container == signature_container and key in keys:
+                    return scanner
+    except (UnicodeDecodeError, ValueError, ReadLimitExceeded):
+        pass
+    return None
+
+
+def sniff_scanner(path: Path) -> Optional[str]:
+    """Определение сканера по содержимому файла отчета"""
+    try:
+        with open(path, 'r') as f:
+            return sniff_stream(f)
+    except OSError:
+        return None
+
+
+def iter_json_files(root: Path, recursive: bool = True):
+    """Обход директории через os.scandir без повторных glob-запросов"""
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    pending.append(entry.path)
+            elif entry.name.lower().endswith('.json') and entry.is_file():
+                yield Path(entry.path)
+
+
+class ReportIndex:
+    """Индекс найденных отчетов: путь к файлу -> тип сканера"""
+
+    def __init__(self):
+        self.reports: Dict[Path, Optional[str]] = {}
+
+    @classmethod
+    def build(cls, roots: List[Tuple[Path, bool]]) -> 'ReportIndex':
+        """
+        Строит индекс за один проход по ``roots``.
+
+        ``roots`` - пары (директория, обходить ли поддиректории). Файл,
+        доступный через несколько корней, индексируется один раз.
+        """
+        index = cls()
+        seen = set()
+        for root, recursive in roots:
+            if not root.is_dir():
+                continue
+            for path in iter_json_files(root, recursive):
+                real_path = path.resolve()
+                if real_path in seen:
+                    continue
+                seen.add(real_path)
+                index.reports[path] = sniff_scanner(path)
+        return index
+
+    def files_for(self, scanner: str) -> List[Path]:
+        return sorted(path for path, kind in self.reports.items() if kind == scanner)
+
+    def unrecognized(self) -> List[Path]:
+        return sorted(path for path, kind in self.reports.items() if kind is None)
+
+    def jobs(self) -> List[Tuple[str, Path]]:
+        """Задания на разбор в фиксированном порядке: по сканеру, затем по пути"""
+        return [(scanner, path) for scanner in SCANNER_ORDER for path in self.files_for(scanner)]
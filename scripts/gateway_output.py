@@ -0,0 +1,142 @@
+"""
+Форматы вывода итогов Security Gateway
+
+Писатель получает итоги отчетов по мере их объединения (``write_tally``)
+и общий отчет в конце (``finish``). JSON Lines и SARIF пишутся потоково:
+каждая запись сериализуется и отправляется в файл сразу, без накопления
+документа в памяти. Markdown собирается один раз из списка строк.
+"""
+
+import json
+from typing import Any, Dict, TextIO
+
+from gateway_parsers import PARSER_REGISTRY, SEVERITY_KEYS
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_LEVELS = ('error', 'error', 'warning', 'note')
+
+SEVERITY_LABELS = (
+    '🔴 Критические',
+    '🟠 Высокие',
+    '🟡 Средние',
+    '🟢 Низкие',
+)
+
+
+def render_markdown(report: Dict[str, Any]) -> str:
+    """Отчет в Markdown для вывода в лог и комментария к PR"""
+    unique = report['unique_findings']
+    lines = ['', '# Отчет безопасности', '', '## Статистика уязвимостей:']
+    lines.extend(f"- {label}: {report[key]}" for key, label in zip(SEVERITY_KEYS, SEVERITY_LABELS))
+    lines.append(f"- 📊 Всего: {report['total_vulnerabilities']}")
+    if unique:
+        lines.append(f"- 🧬 Уникальных: {unique['total_vulnerabilities']} (повторов: {unique['duplicates']})")
+
+    new = report['new_findings']
+    if new is not None:
+        lines.append(f"- 🆕 Новых относительно базового прогона: {new['total_vulnerabilities']} "
+                     f"(критических: {new['critical_vulnerabilities']}, высоких: {new['high_vulnerabilities']})")
+
+    lines.extend(('', '## Рекомендации:'))
+    lines.extend(f"- {rec}" for rec in report['recommendations'])
+    lines.append('')
+    if report['block_deployment']:
+        lines.append("## 🚨 РЕЗУЛЬТАТ: Деплой заблокирован!")
+    else:
+        lines.append("## ✅ РЕЗУЛЬТАТ: Деплой разрешен")
+    return '\n'.join(lines)
+
+
+class ReportWriter:
+    """Базовый писатель: ничего не выводит по ходу разбора"""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+
+    def begin(self):
+        pass
+
+    def write_tally(self, tally: Dict[str, Any]):
+        pass
+
+    def finish(self, report: Dict[str, Any]):
+        pass
+
+
+class MarkdownWriter(ReportWriter):
+    def finish(self, report):
+        self.f.write(render_markdown(report) + '\n')
+
+
+class JsonLinesWriter(ReportWriter):
+    """Строка на каждый отчет сканера и итоговая строка с решением"""
+
+    def write_tally(self, tally):
+        record = {
+            "type": "scan",
+            "scanner": tally['scanner'],
+            "file": str(tally['file']),
+            "error": tally['error'],
+            "recommendations": tally['recommendations'],
+            "block_deployment": tally['block_deployment'],
+        }
+        record.update((key, tally[key]) for key in SEVERITY_KEYS)
+        self.f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def finish(self, report):
+        self.f.write(json.dumps({"type": "summary", **report}, ensure_ascii=False) + '\n')
+
+
+class SarifWriter(ReportWriter):
+    """
+    SARIF 2.1.0: результат на каждый уровень критичности каждого отчета.
+
+    Документ открывается в ``begin``, результаты дописываются по одному, а
+    решение о деплое попадает в свойства запуска в ``finish``.
+    """
+
+    def begin(self):
+        tool = {
+            "driver": {
+                "name": "Security Gateway",
+                "informationUri": "https://github.com/ba6a-yaga/defectdojo",
+                "rules": [
+                    {"id": key, "defaultConfiguration": {"level": level}}
+                    for key, level in zip(SEVERITY_KEYS, SARIF_LEVELS)
+                ],
+            }
+        }
+        self.f.write(f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", '
+                     f'"runs": [{{"tool": {json.dumps(tool)}, "results": [')
+        self.separator = ''
+
+    def write_tally(self, tally):
+        title = PARSER_REGISTRY[tally['scanner']].title
+        for index, (key, level) in enumerate(zip(SEVERITY_KEYS, SARIF_LEVELS)):
+            count = tally[key]
+            if not count:
+                continue
+            result = {
+                "ruleId": key,
+                "ruleIndex": index,
+                "level": level,
+                "message": {"text": f"{title}: {count}"},
+                "locations": [{"physicalLocation": {"artifactLocation": {"uri": str(tally['file'])}}}],
+                "properties": {"scanner": tally['scanner'], "count": count},
+            }
+            self.f.write(self.separator + json.dumps(result, ensure_ascii=False))
+            self.separator = ', '
+
+    def finish(self, report):
+        invocation = {
+            "executionSuccessful": True,
+            "properties": {key: value for key, value in report.items() if key != 'scan_results'},
+        }
+        self.f.write(f'], "invocations": [{json.dumps(invocation, ensure_ascii=False)}]}}]}}\n')
+
+
+WRITERS = {
+    'markdown': MarkdownWriter,
+    'jsonl': JsonLinesWriter,
+    'sarif': SarifWriter,
+}
@@ -0,0 +1,567 @@
+"""
+Разбор отдельных отчетов сканеров для Security Gateway
+
+Каждый сканер описывается классом в реестре ``PARSER_REGISTRY``: путь к
+записям в отчете, признаки формата для поиска, поле исходной критичности
+и таблица ее соответствия уровням. Счетчики собираются пакетно:
+исходные значения считаются через ``Counter``, а таблица применяется
+только к различающимся значениям.
+
+Парсер читает один файл и возвращает итог по нему: счетчики уязвимостей,
+рекомендации, диагностические сообщения и отпечатки находок по уровням.
+Счетчики собираются потоково, и память разбора не зависит от размера
+отчета; отпечатки (9 байт на находку) собираются, только если они нужны
+для дедупликации или сравнения с базовым прогоном.
+Отпечаток - 64-битный хеш полей, однозначно описывающих находку (CWE или
+правило, файл и строка; алерт и нормализованный адрес), по которому
+Security Gateway отбрасывает повторы, в том числе между разными сканерами.
+Парсеры не меняют общего состояния, поэтому их можно выполнять в пуле
+процессов, а итоги затем объединять в фиксированном порядке.
+"""
+
+import hashlib
+import re
+from array import array
+from collections import Counter
+from itertools import compress, tee
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from gateway_stream import iter_path, EACH, ANY_KEY
+
+SEVERITY_KEYS = (
+    'critical_vulnerabilities',
+    'high_vulnerabilities',
+    'medium_vulnerabilities',
+    'low_vulnerabilities',
+)
+
+# Коды уровней - индексы в SEVERITY_KEYS
+CRITICAL, HIGH, MEDIUM, LOW = range(len(SEVERITY_KEYS))
+# Код для значений, которых нет в таблице уровней
+UNMAPPED = 255
+
+# Реестр парсеров; порядок регистрации задает порядок объединения итогов
+PARSER_REGISTRY = {}
+
+
+def register(parser_class):
+    """Декоратор регистрации парсера сканера"""
+    PARSER_REGISTRY[parser_class.name] = parser_class
+    return parser_class
+
+
+def new_tally(scanner: str, path: Path) -> dict:
+    """Пустой итог разбора одного файла"""
+    tally = {
+        "scanner": scanner,
+        "file": str(path),
+        "recommendations": [],
+        "block_deployment": False,
+        "messages": [],
+        "error": None,
+        # Отпечатки находок (array('Q') в байтах) по кодам уровней; None - не собирались
+        "fingerprints": [b''] * len(SEVERITY_KEYS),
+    }
+    for key in SEVERITY_KEYS:
+        tally[key] = 0
+    return tally
+
+
+def fingerprint(fields) -> int:
+    """Стабильный 64-битный отпечаток находки по ее ключевым полям"""
+    data = '\x1f'.join(map(str, fields)).encode('utf-8', 'surrogatepass')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+def normalize_path(path) -> str:
+    """Путь к файлу в едином виде для разных сканеров"""
+    path = str(path or '').replace('\\', '/')
+    while path.startswith('./'):
+        path = path[2:]
+    return path.lstrip('/')
+
+
+_ID_SEGMENT = re.compile(r'^(?:\d+|[0-9a-fA-F]{8,}|[0-9a-fA-F-]{36})$')
+
+
+def normalize_endpoint(url) -> str:
+    """
+    Адрес без переменных частей: схема и хост в нижнем регистре,
+    идентификаторы в пути заменены на {id}, от query остаются имена параметров.
+    """
+    parts = urlsplit(str(url or ''))
+    segments = ['{id}' if _ID_SEGMENT.match(segment) else segment
+                for segment in parts.path.split('/')]
+    params = sorted({name for name, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    endpoint = f"{parts.scheme.lower()}://{parts.netloc.lower()}{'/'.join(segments) or '/'}"
+    return endpoint + ('?' + '&'.join(params) if params else '')
+
+
+_CWE = re.compile(r'CWE-(\d+)', re.IGNORECASE)
+
+
+def cwe_id(value):
+    """Номер CWE из числа, строки 'CWE-79: ...' или списка таких строк"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get('id')
+    if isinstance(value, int):
+        return value
+    match = _CWE.search(str(value or ''))
+    return int(match.group(1)) if match else None
+
+
+def aggregate_severities(raw_counts: Counter, severity_map: dict) -> list:
+    """Переводит счетчик исходных значений в счетчики по кодам уровней"""
+    totals = [0] * len(SEVERITY_KEYS)
+    for raw, count in raw_counts.items():
+        code = severity_map.get(raw)
+        if code is not None:
+            totals[code] += count
+    return totals
+
+
+_EMPTY = {}
+
+
+def _get_each(records, key, default):
+    # Генератор дешевле вызова функции или methodcaller на каждую запись
+    return (record.get(key, default) for record in records)
+
+
+class ScannerParser:
+    """
+    Базовый парсер отчета.
+
+    Подклассы задают ``name``, ``title``, ``record_path`` (путь к записям
+    для ``iter_path``), ``signature`` (контейнер и ключи для распознавания
+    отчета), ``severity_field`` с ``default_severity`` и ``severity_map``,
+    а также ``fingerprint_fields`` для дедупликации.
+    Значения, которых нет в ``severity_map``, не учитываются.
+    """
+
+    name = None
+    title = None
+    # Версия разбора; увеличивается при любом изменении итогов парсера
+    version = 2
+    record_path = ()
+    signature = ('object', frozenset())
+    # Путь к полю критичности внутри записи и значение по умолчанию
+    severity_field = ()
+    default_severity = None
+    severity_map = {}
+    # Шаблон рекомендации; подставляется общее число записей
+    recommendation = None
+    # Любая находка блокирует деплой
+    blocks_deployment = False
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def severities(self, records):
+        """Поток исходных значений критичности записей"""
+        *parents, field = self.severity_field
+        for key in parents:
+            records = _get_each(records, key, _EMPTY)
+        return _get_each(records, field, self.default_severity)
+
+    def fingerprint_fields(self, record) -> tuple:
+        """Поля, по которым одинаковые находки считаются одной"""
+        raise NotImplementedError
+
+    def describe(self, record) -> dict:
+        """Описательные поля находки для импорта в приложение"""
+        return {'title': f"{self.title} finding"}
+
+    def records(self, f):
+        return iter_path(f, self.record_path)
+
+    def _fingerprinted(self, records, sink: array):
+        """Пропускает записи дальше, попутно сохраняя их отпечатки"""
+        fields = self.fingerprint_fields
+        append = sink.append
+        for record in records:
+            append(fingerprint(fields(record)))
+            yield record
+
+    def _coded(self, severities, codes: bytearray):
+        """Пропускает значения критичности дальше, попутно записывая коды уровней"""
+        severity_map = self.severity_map
+        append = codes.append
+        for raw in severities:
+            append(severity_map.get(raw, UNMAPPED))
+            yield raw
+
+    def parse(self, fingerprints: bool = True) -> dict:
+        """
+        Итог разбора файла.
+
+        Исходные значения критичности считаются ``Counter`` по мере чтения и
+        не накапливаются. С ``fingerprints`` отпечаток и код уровня каждой
+        записи пишутся в плоские массивы и в конце группируются по уровням.
+        """
+        tally = new_tally(self.name, self.path)
+        sink, codes = array('Q'), bytearray()
+        with open(self.path, 'r') as f:
+            records = self.records(f)
+            if fingerprints:
+                severities = self._coded(self.severities(self._fingerprinted(records, sink)), codes)
+            else:
+                severities = self.severities(records)
+            raw_counts = Counter(severities)
+
+        for key, count in zip(SEVERITY_KEYS, aggregate_severities(raw_counts, self.severity_map)):
+            tally[key] = count
+
+        if fingerprints:
+            # Группировка отпечатков по кодам - без цикла на Python
+            tally['fingerprints'] = [
+                array('Q', compress(sink, map(code.__eq__, codes))).tobytes()
+                for code in range(len(SEVERITY_KEYS))
+            ]
+        else:
+            tally['fingerprints'] = None
+
+        self.summarize(tally, sum(raw_counts.values()), raw_counts)
+        return tally
+
+    def findings(self, f):
+        """
+        Нормализованные находки отчета из открытого файла ``f``.
+
+        Каждая находка - поля из ``describe`` плюс код уровня и отпечаток;
+        записи, критичности которых нет в таблице, пропускаются.
+        """
+        records, copies = tee(self.records(f))
+        fields = self.fingerprint_fields
+        severity_map = self.severity_map
+        for record, raw in zip(copies, self.severities(records)):
+            code = severity_map.get(raw)
+            if code is None:
+                continue
+            finding = self.describe(record)
+            finding['severity'] = code
+            finding['fingerprint'] = fingerprint(fields(record))
+            yield finding
+
+    def summarize(self, tally: dict, total: int, raw_counts: Counter):
+        """Рекомендации и сообщения по итогам разбора"""
+        if total and self.recommendation:
+            tally['recommendations'].append(self.recommendation.format(total=total))
+        if total and self.blocks_deployment:
+            tally['block_deployment'] = True
+
+
+@register
+class BanditParser(ScannerParser):
+    name = 'bandit'
+    title = 'Bandit'
+    record_path = ('results', EACH)
+    signature = ('object', frozenset({'generated_at'}))
+    severity_field = ('issue_severity',)
+    default_severity = 'medium'
+    severity_map = {'HIGH': HIGH, 'MEDIUM': MEDIUM, 'LOW': LOW}
+    recommendation = "Bandit обнаружил {total} проблем безопасности в коде"
+
+    def fingerprint_fields(self, issue):
+        cwe = cwe_id(issue.get('issue_cwe'))
+        rule = ('cwe', cwe) if cwe else ('bandit', issue.get('test_id'))
+        return rule + (normalize_path(issue.get('filename')), issue.get('line_number'))
+
+    def describe(self, issue):
+        return {
+            'title': issue.get('test_name') or issue.get('test_id') or 'Bandit issue',
+            'description': issue.get('issue_text', ''),
+            'cwe': cwe_id(issue.get('issue_cwe')),
+            'file_path': normalize_path(issue.get('filename')),
+            'line': issue.get('line_number'),
+        }
+
+    def summarize(self, tally, total, raw_counts):
+        tally['messages'].append(f"📄 Анализ файла Bandit: {self.path}")
+        tally['messages'].append(f"📊 Найдено {total} проблем в Bandit отчете")
+        if not total:
+            tally['messages'].append("ℹ️ Проблем в Bandit отчете не найдено")
+        super().summarize(tally, total, raw_counts)
+
+
+@register
+class SemgrepParser(ScannerParser):
+    name = 'semgrep'
+    title = 'Semgrep'
+    record_path = ('results', EACH)
+    signature = ('object', frozenset({'paths'}))
+    severity_field = ('extra', 'severity')
+    default_severity = 'WARNING'
+    severity_map = {'ERROR': HIGH, 'WARNING': MEDIUM, 'INFO': LOW}
+    recommendation = "Semgrep обнаружил {total} потенциальных проблем"
+
+    def fingerprint_fields(self, result):
+        cwe = cwe_id(result.get('extra', {}).get('metadata', {}).get('cwe'))
+        rule = ('cwe', cwe) if cwe else ('semgrep', result.get('check_id'))
+        line = result.get('start', {}).get('line')
+        return rule + (normalize_path(result.get('path')), line)
+
+    def describe(self, result):
+        extra = result.get('extra', {})
+        return {
+            'title': result.get('check_id') or 'Semgrep finding',
+            'description': extra.get('message', ''),
+            'cwe': cwe_id(extra.get('metadata', {}).get('cwe')),
+            'file_path': normalize_path(result.get('path')),
+            'line': result.get('start', {}).get('line'),
+        }
+
+
+# Особые алерты ZAP, для которых даются отдельные рекомендации
+ZAP_SPECTRE = 'spectre'
+ZAP_HTTP_METHOD = 'http_method'
+
+
+@register
+class ZapParser(ScannerParser):
+    name = 'zap'
+    title = 'ZAP'
+    record_path = ('alerts', EACH)
+    signature = ('object', frozenset({'alerts'}))
+    severity_map = {
+        ZAP_SPECTRE: MEDIUM,
+        ZAP_HTTP_METHOD: MEDIUM,
+        'High': HIGH,
+        'Medium': MEDIUM,
+        'Low': LOW,
+    }
+    recommendation = "OWASP ZAP обнаружил {total} уязвимостей в приложении"
+
+    def severities(self, records):
+        return map(self.extract, records)
+
+    def fingerprint_fields(self, alert):
+        alert_id = alert.get('pluginid') or alert.get('id') or alert.get('name')
+        return ('zap', alert_id, normalize_endpoint(alert.get('url') or alert.get('uri')))
+
+    def describe(self, alert):
+        cwe = str(alert.get('cweid', ''))
+        return {
+            'title': alert.get('name') or alert.get('alert') or 'ZAP alert',
+            'description': alert.get('desc', '') or alert.get('description', ''),
+            'cwe': int(cwe) if cwe.isdigit() and int(cwe) > 0 else None,
+            'endpoint': alert.get('url') or alert.get('uri') or '',
+        }
+
+    def extract(self, alert):
+        alert_id = alert.get('id', '')
+        alert_name = alert.get('name', '')
+        # Spectre (90004) и небезопасные HTTP методы (90028) - средний уровень
+        if alert_id == '90004' or 'Spectre' in alert_name:
+            return ZAP_SPECTRE
+        if alert_id == '90028' or 'Insecure HTTP Method' in alert_name:
+            return ZAP_HTTP_METHOD
+        return alert.get('risk', 'Medium')
+
+    def summarize(self, tally, total, raw_counts):
+        tally['messages'].append(f"📄 Анализ файла ZAP: {self.path}")
+        tally['messages'].append(f"📊 Найдено {total} уязвимостей в ZAP отчете")
+        if not total:
+            tally['messages'].append("ℹ️ Уязвимостей в ZAP отчете не найдено")
+            return
+
+        spectre_count = raw_counts[ZAP_SPECTRE]
+        http_method_count = raw_counts[ZAP_HTTP_METHOD]
+        if spectre_count > 0:
+            tally['recommendations'].append(f"Обнаружено {spectre_count} предупреждений Spectre - рекомендуется добавить заголовки безопасности")
+        if http_method_count > 0:
+            tally['recommendations'].append(f"Обнаружено {http_method_count} небезопасных HTTP методов - рекомендуется ограничить доступные методы")
+        super().summarize(tally, total, raw_counts)
+
+
+@register
+class NucleiParser(ScannerParser):
+    name = 'nuclei'
+    title = 'Nuclei'
+    record_path = (EACH,)
+    signature = ('array', frozenset({'template-id', 'templateID', 'matched-at'}))
+    severity_field = ('info', 'severity')
+    default_severity = 'medium'
+    severity_map = {'critical': CRITICAL, 'high': HIGH, 'medium': MEDIUM, 'low': LOW}
+    recommendation = "Nuclei обнаружил {total} уязвимостей"
+
+    def fingerprint_fields(self, result):
+        template = result.get('template-id') or result.get('templateID')
+        return ('nuclei', template, normalize_endpoint(result.get('matched-at') or result.get('host')))
+
+    def describe(self, result):
+        info = result.get('info', {})
+        return {
+            'title': info.get('name') or result.get('template-id') or result.get('templateID') or 'Nuclei finding',
+            'description': info.get('description', ''),
+            'cwe': cwe_id(info.get('classification', {}).get('cwe-id')),
+            'endpoint': result.get('matched-at') or result.get('host') or '',
+        }
+
+
+@register
+class TruffleHogParser(ScannerParser):
+    name = 'trufflehog'
+    title = 'TruffleHog'
+    record_path = (EACH,)
+    signature = ('array', frozenset({'DetectorName', 'SourceMetadata', 'stringsFound'}))
+    # Каждый найденный секрет - критическая уязвимость
+    severity_map = {'secret': CRITICAL}
+    recommendation = "TruffleHog обнаружил {total} секретов в коде"
+    blocks_deployment = True
+
+    def severities(self, records):
+        return ('secret' for _ in records)
+
+    def fingerprint_fields(self, result):
+        # Секрет в одном и том же месте файла совпадает с находкой Gitleaks
+        data = result.get('SourceMetadata', {}).get('Data', {})
+        location = data.get('Filesystem') or data.get('Git') or {}
+        if location:
+            return ('secret', normalize_path(location.get('file')), location.get('line'))
+        return ('secret', normalize_path(result.get('path')), result.get('reason'))
+
+    def describe(self, result):
+        data = result.get('SourceMetadata', {}).get('Data', {})
+        location = data.get('Filesystem') or data.get('Git') or {}
+        return {
+            'title': f"Secret: {result.get('DetectorName') or result.get('reason') or 'unknown'}",
+            'file_path': normalize_path(location.get('file') or result.get('path')),
+            'line': location.get('line'),
+        }
+
+
+@register
+class CheckovParser(ScannerParser):
+    name = 'checkov'
+    title = 'Checkov'
+    record_path = ('results', ANY_KEY, 'failed_checks', EACH)
+    signature = ('object', frozenset({'check_type'}))
+    severity_field = ('severity',)
+    default_severity = 'MEDIUM'
+    severity_map = {'CRITICAL': CRITICAL, 'HIGH': HIGH, 'MEDIUM': MEDIUM, 'LOW': LOW}
+
+    def fingerprint_fields(self, check):
+        return ('checkov', check.get('check_id'), normalize_path(check.get('file_path')),
+                check.get('resource'))
+
+    def describe(self, check):
+        line_range = check.get('file_line_range') or [None]
+        return {
+            'title': check.get('check_name') or check.get('check_id') or 'Checkov check',
+            'description': f"Resource: {check.get('resource', '')}",
+            'file_path': normalize_path(check.get('file_path')),
+            'line': line_range[0],
+        }
+
+    def records(self, f):
+        # Непустой results отмечается при обходе его ключей
+        self.results_seen = False
+
+        def on_member(depth, key):
+            if depth == 1:
+                self.results_seen = True
+
+        return iter_path(f, self.record_path, on_member=on_member)
+
+    def summarize(self, tally, total, raw_counts):
+        if self.results_seen:
+            tally['recommendations'].append(
+                f"Checkov обнаружил проблемы в инфраструктуре"
+            )
+
+
+@register
+class TrivyParser(ScannerParser):
+    name = 'trivy'
+    title = 'Trivy'
+    record_path = ('Results', EACH, 'Vulnerabilities', EACH)
+    signature = ('object', frozenset({'SchemaVersion', 'ArtifactName'}))
+    severity_field = ('Severity',)
+    default_severity = 'UNKNOWN'
+    severity_map = {'CRITICAL': CRITICAL, 'HIGH': HIGH, 'MEDIUM': MEDIUM, 'LOW': LOW}
+    recommendation = "Trivy обнаружил {total} уязвимостей в зависимостях образа"
+
+    def fingerprint_fields(self, vulnerability):
+        return ('package', vulnerability.get('VulnerabilityID'),
+                vulnerability.get('PkgName'), vulnerability.get('InstalledVersion'))
+
+    def describe(self, vulnerability):
+        return {
+            'title': f"{vulnerability.get('VulnerabilityID')} in {vulnerability.get('PkgName')}",
+            'description': vulnerability.get('Title', ''),
+            'cwe': cwe_id(vulnerability.get('CweIDs')),
+        }
+
+
+@register
+class GrypeParser(ScannerParser):
+    name = 'grype'
+    title = 'Grype'
+    record_path = ('matches', EACH)
+    signature = ('object', frozenset({'matches'}))
+    severity_field = ('vulnerability', 'severity')
+    default_severity = 'Unknown'
+    severity_map = {'Critical': CRITICAL, 'High': HIGH, 'Medium': MEDIUM, 'Low': LOW}
+    recommendation = "Grype обнаружил {total} уязвимостей в зависимостях"
+
+    def fingerprint_fields(self, match):
+        # Совпадает с отпечатком Trivy для того же пакета и уязвимости
+        artifact = match.get('artifact', {})
+        return ('package', match.get('vulnerability', {}).get('id'),
+                artifact.get('name'), artifact.get('version'))
+
+    def describe(self, match):
+        vulnerability = match.get('vulnerability', {})
+        return {
+            'title': f"{vulnerability.get('id')} in {match.get('artifact', {}).get('name')}",
+            'description': vulnerability.get('description', ''),
+        }
+
+
+@register
+class GitleaksParser(ScannerParser):
+    name = 'gitleaks'
+    title = 'Gitleaks'
+    record_path = (EACH,)
+    signature = ('array', frozenset({'RuleID'}))
+    severity_map = {'secret': CRITICAL}
+    recommendation = "Gitleaks обнаружил {total} секретов в коде"
+    blocks_deployment = True
+
+    def severities(self, records):
+        return ('secret' for _ in records)
+
+    def fingerprint_fields(self, finding):
+        return ('secret', normalize_path(finding.get('File')), finding.get('StartLine'))
+
+    def describe(self, finding):
+        return {
+            'title': f"Secret: {finding.get('RuleID') or 'unknown'}",
+            'description': finding.get('Description', ''),
+            'file_path': normalize_path(finding.get('File')),
+            'line': finding.get('StartLine'),
+        }
+
+
+def parse_report(job, fingerprints: bool = True) -> dict:
+    """
+    Разбирает один отчет; ``job`` - пара (сканер, путь).
+
+    Ошибки разбора не пробрасываются: итог файла остается пустым, а текст
+    ошибки попадает в сообщения, как и при последовательном анализе.
+    """
+    scanner, path = job
+    parser_class = PARSER_REGISTRY[scanner]
+    try:
+        return parser_class(Path(path)).parse(fingerprints)
+    except Exception as e:
+        tally = new_tally(scanner, path)
+        if not fingerprints:
+            tally['fingerprints'] = None
+        tally['error'] = str(e)
+        tally['messages'].append(f"❌ Ошибка при анализе {parser_class.title}: {e}")
+        return tally
@@ -0,0 +1,234 @@
+"""
+Потоковый разбор JSON-отчетов сканеров безопасности
+
+Отчеты читаются блоками фиксированного размера, а элементы по заданному
+пути (например ``results[]`` или ``alerts[]``) декодируются по одному.
+Все остальные значения пропускаются без построения Python-объектов, поэтому
+расход памяти не зависит от размера отчета.
+"""
+
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _Wildcard:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+# Шаг пути: каждый элемент массива
+EACH = _Wildcard('EACH')
+# Шаг пути: значение под любым ключом объекта
+ANY_KEY = _Wildcard('ANY_KEY')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_SCALAR = re.compile(r'[-+.0-9A-Za-z]*')
+
+
+class ReadLimitExceeded(Exception):
+    """Документ не уложился в заданный лимит чтения"""
+
+
+class JsonStream:
+    """Инкрементальный читатель одного JSON-документа из файла"""
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE, limit=None):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._limit = limit
+        self._read = 0
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Дочитывает следующий блок, отбрасывая уже разобранную часть буфера"""
+        if self._eof:
+            return False
+        if self._limit is not None and self._read >= self._limit:
+            raise ReadLimitExceeded(self._read)
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._read += len(chunk)
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Возвращает следующий значимый символ ('' в конце файла)"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"Ожидался символ {char!r} в позиции {self._pos}")
+        self._pos += 1
+
+    def _decode(self):
+        """Декодирует одно значение, при необходимости дочитывая файл"""
+        char = self._peek()
+        if char not in ('"', '[', '{'):
+            # Число или литерал на границе блока может продолжаться дальше
+            while (_SCALAR.match(self._buf, self._pos).end() == len(self._buf)
+                   and self._fill()):
+                pass
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            self._pos = end
+            return value
+
+    def _skip_string(self):
+        while True:
+            match = _STRING.match(self._buf, self._pos)
+            if match:
+                self._pos = match.end()
+                return
+            if not self._fill():
+                raise ValueError("Незавершенная строка в JSON")
+
+    def _skip(self):
+        """Пропускает значение, не создавая для него Python-объектов"""
+        char = self._peek()
+        if char == '"':
+            self._skip_string()
+            return
+        if char not in ('[', '{'):
+            self._decode()
+            return
+
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise ValueError("Неожиданный конец JSON")
+                continue
+            self._pos = match.start()
+            char = match.group()
+            if char == '"':
+                self._skip_string()
+                continue
+            self._pos += 1
+            if char in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _members(self):
+        """Перебирает ключи объекта; значение должен поглотить вызывающий"""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                raise ValueError(f"Ожидался ключ объекта в позиции {self._pos}")
+            key = self._decode()
+            self._expect(':')
+            yield key
+            char = self._peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError(f"Ожидался ',' или '}}' в позиции {self._pos - 1}")
+
+    def _elements(self):
+        """Перебирает индексы массива; элемент должен поглотить вызывающий"""
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            char = self._peek()
+            self._pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Ожидался ',' или ']' в позиции {self._pos - 1}")
+
+    def _walk(self, path, depth, on_member):
+        if depth == len(path):
+            yield self._decode()
+            return
+
+        step = path[depth]
+        char = self._peek()
+        if char == '{' and step is not EACH:
+            for key in self._members():
+                if on_member is not None:
+                    on_member(depth, key)
+                if step is ANY_KEY or key == step:
+                    yield from self._walk(path, depth + 1, on_member)
+                else:
+                    self._skip()
+        elif char == '[' and step is EACH:
+            for index in self._elements():
+                if on_member is not None:
+                    on_member(depth, index)
+                yield from self._walk(path, depth + 1, on_member)
+        else:
+            # Значение другого типа, чем ожидает путь, - как dict.get(..., [])
+            self._skip()
+
+    def iter_path(self, path, on_member=None):
+        """
+        Возвращает значения, найденные по пути ``path``.
+
+        Шагами пути служат ключи объектов, ``EACH`` (элементы массива) и
+        ``ANY_KEY`` (значения объекта под любым ключом). Если задан
+        ``on_member(depth, key)``, он вызывается для каждого члена
+        контейнеров, через которые проходит путь.
+        """
+        return self._walk(tuple(path), 0, on_member)
+
+    def iter_shape(self):
+        """
+        Перебирает ключи, описывающие форму документа.
+
+        Для объекта возвращает пары ``('object', ключ)`` для ключей верхнего
+        уровня, не декодируя значений. Для массива - пары ``('array', ключ)``
+        для ключей его первого элемента-объекта; остальные элементы не читаются.
+        """
+        char = self._peek()
+        if char == '{':
+            for key in self._members():
+                yield 'object', key
+                self._skip()
+        elif char == '[':
+            for _ in self._elements():
+                item = self._decode()
+                if isinstance(item, dict):
+                    for key in item:
+                        yield 'array', key
+                return
+
+
+def iter_path(fp, path, on_member=None, chunk_size=CHUNK_SIZE):
+    """Потоково перебирает значения по пути ``path`` в JSON-файле ``fp``"""
+    return JsonStream(fp, chunk_size).iter_path(path, on_member)
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Security Gateway - Анализ результатов безопасности и блокировка деплоя
+
+Модуль можно импортировать: ``run()`` возвращает итоговый отчет и не
+завершает процесс. Скрипт ``security-gateway.py`` вызывает ``main()``.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Any, Tuple
+
+from gateway_baseline import Baseline, BaselineError, diff_against_baseline, write_fingerprints
+from gateway_cache import ResultCache
+from gateway_dedup import deduplicate
+from gateway_discovery import SCANNER_ORDER, ReportIndex
+from gateway_output import WRITERS
+from gateway_parsers import PARSER_REGISTRY, SEVERITY_KEYS, parse_report
+
+class SecurityGateway:
+    def __init__(self, workers: int = None, cache_dir: str = None,
+                 baseline: str = None, fingerprints_out: str = None,
+                 output_format: str = None, output: str = None, quiet: bool = None,
+                 dedup: bool = None):
+        self.results_dir = Path("all-results")
+        # Формат итогового отчета (markdown, jsonl, sarif) и куда его писать ('-' - stdout)
+        self.output_format = output_format or os.environ.get('GATEWAY_FORMAT', 'markdown')
+        if self.output_format not in WRITERS:
+            raise ValueError(f"Неизвестный формат отчета: {self.output_format}")
+        self.output = output or os.environ.get('GATEWAY_OUTPUT', '-')
+        # В тихом режиме сообщения копятся в log_lines и не выводятся по ходу работы
+        if quiet is None:
+            quiet = os.environ.get('GATEWAY_QUIET', '').lower() in ('1', 'true', 'yes')
+        self.quiet = quiet
+        self.log_lines: List[str] = []
+        # Число процессов для разбора отчетов (по умолчанию - по числу CPU)
+        self.workers = workers or int(os.environ.get('GATEWAY_WORKERS', 0)) or os.cpu_count() or 1
+        # Кеш итогов разбора; пустой GATEWAY_CACHE_DIR отключает кеш
+        if cache_dir is None:
+            cache_dir = os.environ.get('GATEWAY_CACHE_DIR', '.security-gateway-cache')
+        self.cache = None
+        if cache_dir:
+            max_mb = int(os.environ.get('GATEWAY_CACHE_MAX_MB', 64))
+            self.cache = ResultCache(Path(cache_dir), max_bytes=max_mb * 1024 * 1024)
+        # Решение по уникальным находкам; без дедупликации - по всем находкам
+        if dedup is None:
+            dedup = os.environ.get('GATEWAY_DEDUP', '1').lower() not in ('0', 'false', 'no')
+        self.dedup = dedup
+        # Отпечатки предыдущего прогона основной ветки: блокируют только новые находки
+        self.baseline = baseline or os.environ.get('GATEWAY_BASELINE') or None
+        # Отпечатки собираются только для дедупликации и сравнения с базовым прогоном:
+        # без них память разбора не зависит от числа находок
+        self.fingerprints = self.dedup or bool(self.baseline)
+        # Куда сохранить отпечатки этого прогона (пустое значение - не сохранять)
+        if fingerprints_out is None:
+            fingerprints_out = os.environ.get('GATEWAY_FINGERPRINTS', 'security-fingerprints.bin')
+        self.fingerprints_out = fingerprints_out or None
+        # Сканер сам требует блокировки (например, найдены секреты)
+        self.scanner_blocks = False
+        self.security_report = {
+            "critical_vulnerabilities": 0,
+            "high_vulnerabilities": 0,
+            "medium_vulnerabilities": 0,
+            "low_vulnerabilities": 0,
+            "total_vulnerabilities": 0,
+            "recommendations": [],
+            "block_deployment": False,
+            "scan_results": {},
+            # Те же счетчики без повторов одной находки; по ним принимается решение
+            "unique_findings": {},
+            # Находки, которых нет в базовом наборе (только при заданном baseline)
+            "new_findings": None
+        }
+        
+    def log(self, message: str):
+        # Сообщения идут в stderr: stdout занят отчетом (JSON Lines и SARIF должны остаться валидными)
+        if self.quiet:
+            self.log_lines.append(message)
+        else:
+            print(message, file=sys.stderr)
+    
+    def open_output(self):
+        if self.output == '-':
+            return contextlib.nullcontext(sys.stdout)
+        return open(self.output, 'w')
+    
+    def discover_reports(self) -> List[Tuple[str, Path]]:
+        """Поиск отчетов сканеров за один обход дерева результатов"""
+        self.log("🔍 Поиск отчетов сканеров...")
+        
+        index = ReportIndex.build([
+            (self.results_dir, True),
+            (Path("sast-results"), True),  # Прямо в корне
+            (Path("security-results"), True),  # Альтернативное имя
+            (Path("."), False),  # Отчет ZAP в рабочей директории
+        ])
+        
+        self.log(f"📁 Проиндексировано JSON файлов: {len(index.reports)}")
+        missing = []
+        for scanner in SCANNER_ORDER:
+            files = index.files_for(scanner)
+            if not files:
+                missing.append(scanner)
+            for file in files:
+                self.log(f"  - {scanner}: {file}")
+        
+        unrecognized = index.unrecognized()
+        if unrecognized:
+            self.log(f"ℹ️ Не распознаны как отчеты сканеров: {len(unrecognized)}")
+            for file in unrecognized:
+                self.log(f"  - {file}")
+        if missing:
+            self.log(f"⚠️ Отчеты не найдены: {', '.join(missing)}")
+        
+        return index.jobs()
+    
+    def parse_reports(self, jobs: List[Tuple[str, Path]]) -> List[Dict[str, Any]]:
+        """
+        Разбор отчетов без участия кеша.
+        
+        JSON-декодирование нагружает CPU, поэтому отчеты разбираются в пуле
+        процессов. Итоги возвращаются в порядке ``jobs``, независимо от того,
+        какой файл был разобран раньше.
+        """
+        parse = partial(parse_report, fingerprints=self.fingerprints)
+        workers = min(self.workers, len(jobs))
+        if workers <= 1:
+            return [parse(job) for job in jobs]
+        
+        self.log(f"⚙️ Параллельный разбор {len(jobs)} отчетов в {workers} процессах")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(parse, jobs))
+    
+    def ingest_reports(self, jobs: List[Tuple[str, Path]]) -> List[Dict[str, Any]]:
+        """Итоги по всем отчетам: неизменившиеся берутся из кеша, остальные разбираются"""
+        if self.cache is None:
+            return self.parse_reports(jobs)
+        
+        tallies = [None] * len(jobs)
+        keys = []
+        for i, (scanner, path) in enumerate(jobs):
+            key = self.cache.key(scanner, path, PARSER_REGISTRY[scanner].version, self.fingerprints)
+            keys.append(key)
+            tallies[i] = self.cache.get(key)
+        
+        pending = [i for i, tally in enumerate(tallies) if tally is None]
+        self.log(f"♻️ Из кеша: {len(jobs) - len(pending)} из {len(jobs)} отчетов")
+        for i, tally in zip(pending, self.parse_reports([jobs[i] for i in pending])):
+            tallies[i] = tally
+            # Ошибки разбора не кешируются: файл мог быть записан не до конца
+            if tally['error'] is None:
+                self.cache.put(keys[i], tally)
+        
+        self.cache.save()
+        return tallies
+    
+    def merge_tally(self, tally: Dict[str, Any]):
+        """Добавление итогов одного отчета в общий отчет"""
+        for message in tally['messages']:
+            self.log(message)
+        
+        for key in SEVERITY_KEYS:
+            self.security_report[key] += tally[key]
+        self.security_report['recommendations'].extend(tally['recommendations'])
+        if tally['block_deployment']:
+            self.scanner_blocks = True
+    
+    def compare_with_baseline(self, by_severity):
+        """Подсчет находок, которых не было в базовом прогоне"""
+        if not self.baseline:
+            return
+        try:
+            with Baseline(Path(self.baseline)) as baseline:
+                new = diff_against_baseline(baseline, by_severity)
+        except FileNotFoundError:
+            self.log(f"⚠️ Базовый набор {self.baseline} не найден, учитываются все находки")
+            return
+        except BaselineError as e:
+            self.log(f"⚠️ Базовый набор не прочитан ({e}), учитываются все находки")
+            return
+        
+        self.security_report['new_findings'] = new
+        self.log(f"🆕 Новых находок относительно базового прогона: {new['total_vulnerabilities']} "
+              f"(в базовом наборе: {new['baseline_findings']})")
+    
+    def deduplicate(self, tallies: List[Dict[str, Any]]):
+        """Уникальные находки, сравнение с базовым прогоном и сохранение отпечатков"""
+        unique, by_severity = deduplicate(tallies)
+        if self.dedup:
+            self.security_report['unique_findings'] = unique
+        self.compare_with_baseline(by_severity)
+        if self.fingerprints_out:
+            count = write_fingerprints(Path(self.fingerprints_out), by_severity)
+            self.log(f"💾 Отпечатки {count} находок сохранены в {self.fingerprints_out}")
+    
+    def calculate_totals(self):
+        """Подсчет общих результатов"""
+        self.security_report['total_vulnerabilities'] = (
+            self.security_report['critical_vulnerabilities'] +
+            self.security_report['high_vulnerabilities'] +
+            self.security_report['medium_vulnerabilities'] +
+            self.security_report['low_vulnerabilities']
+        )
+        
+        unique = (self.security_report['new_findings'] or self.security_report['unique_findings']
+                  or self.security_report)
+        
+        # С базовым набором решение принимается только по новым находкам
+        if self.scanner_blocks and self.security_report['new_findings'] is None:
+            self.security_report['block_deployment'] = True
+        
+        # Блокируем деплой при критических уязвимостях
+        if unique['critical_vulnerabilities'] > 0:
+            self.security_report['block_deployment'] = True
+            self.security_report['recommendations'].append(
+                "🚨 КРИТИЧЕСКИЕ УЯЗВИМОСТИ ОБНАРУЖЕНЫ! Деплой заблокирован."
+            )
+        
+        # Блокируем деплой при высоком количестве высоких уязвимостей
+        if unique['high_vulnerabilities'] >= 5:
+            self.security_report['block_deployment'] = True
+            self.security_report['recommendations'].append(
+                "⚠️ Обнаружено много высоких уязвимостей! Деплой заблокирован."
+            )
+    
+    def save_report(self):
+        """Сохранение итогового отчета в JSON для следующих шагов пайплайна"""
+        with open('security-report.json', 'w') as f:
+            json.dump(self.security_report, f, indent=2)
+    
+    def run(self) -> Dict[str, Any]:
+        """Запуск анализа; возвращает итоговый отчет"""
+        self.log("🛡️ Security Gateway запущен")
+        
+        if not self.results_dir.exists():
+            self.log(f"⚠️ Директория {self.results_dir} не найдена")
+            return self.security_report
+        
+        jobs = self.discover_reports()
+        tallies = self.ingest_reports(jobs)
+        with self.open_output() as f:
+            writer = WRITERS[self.output_format](f)
+            writer.begin()
+            for tally in tallies:
+                self.merge_tally(tally)
+                writer.write_tally(tally)
+            if self.fingerprints:
+                self.deduplicate(tallies)
+            else:
+                self.log("ℹ️ Дедупликация отключена, решение принимается по всем находкам")
+            
+            self.calculate_totals()
+            self.log("📊 Генерация отчета безопасности...")
+            writer.finish(self.security_report)
+        
+        self.save_report()
+        return self.security_report
+
+def run(**options) -> Dict[str, Any]:
+    """Запуск Security Gateway без вывода в stdout и без выхода из процесса"""
+    options.setdefault('quiet', True)
+    options.setdefault('output', os.devnull)
+    return SecurityGateway(**options).run()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Security Gateway - анализ результатов безопасности")
+    parser.add_argument('--baseline', help='Файл отпечатков базового прогона; блокируют только новые находки')
+    parser.add_argument('--write-fingerprints', metavar='PATH',
+                        help='Куда сохранить отпечатки этого прогона (по умолчанию security-fingerprints.bin)')
+    parser.add_argument('--format', choices=list(WRITERS), help='Формат отчета (по умолчанию markdown)')
+    parser.add_argument('--output', metavar='PATH', help="Файл для отчета ('-' - stdout)")
+    parser.add_argument('--no-dedup', dest='dedup', action='store_false', default=None,
+                        help='Не сводить повторы: решение по всем находкам, память разбора постоянна')
+    parser.add_argument('--quiet', action='store_true', default=None,
+                        help='Не выводить сообщения по ходу работы; они пишутся в stderr в конце')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    gateway = SecurityGateway(baseline=args.baseline, fingerprints_out=args.write_fingerprints,
+                              output_format=args.format, output=args.output, quiet=args.quiet,
+                              dedup=args.dedup)
+    report = gateway.run()
+    if gateway.log_lines:
+        sys.stderr.write('\n'.join(gateway.log_lines) + '\n')
+    
+    # Возвращаем код ошибки если деплой заблокирован
+    sys.exit(1 if report['block_deployment'] else 0)
+
+if __name__ == "__main__":
+    main()
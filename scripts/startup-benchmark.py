@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Замер запуска Defect Dojo
+
+Профиль импорта: загрузка приложения (dojo.wsgi и URLconf, как перед
+первым запросом) под ``python -X importtime``; собственное время модулей
+складывается по пакетам верхнего уровня, и печатаются самые дорогие
+пакеты и модули.
+
+Время до первого ответа: команда запуска (по умолчанию gunicorn с
+gunicorn.conf.py, ``--entrypoint`` - docker-entrypoint.sh целиком) и
+опрос пути, пока он не ответит 200. Настройки базы и прочего берутся из
+текущего окружения, как у manage.py. Пример:
+  python scripts/startup-benchmark.py --entrypoint --repeat 3
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Загрузка приложения до первого запроса
+BOOTSTRAP = (
+    "import os; os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dojo.settings'); "
+    "from dojo.wsgi import application; "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def import_profile(python):
+    """Собственное время импорта (мкс) по модулям и общее время загрузки"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', BOOTSTRAP],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode:
+        sys.exit(f"❌ Приложение не загрузилось:\n{result.stderr[-2000:]}")
+    modules = {}
+    for match in IMPORT_LINE.finditer(result.stderr):
+        modules[match.group(4)] = int(match.group(1))
+    return modules, elapsed
+
+
+def report_imports(args):
+    runs = [import_profile(args.python) for _ in range(args.repeat)]
+    # Минимум по прогонам убирает шум от планировщика и дискового кеша
+    modules = {name: min(run[0].get(name, 0) for run in runs) for name in runs[0][0]}
+    packages = defaultdict(lambda: [0, 0])
+    for name, self_us in modules.items():
+        package = packages[name.split('.')[0]]
+        package[0] += self_us
+        package[1] += 1
+    total = sum(modules.values())
+
+    print(f"📦 Загрузка приложения: {min(run[1] for run in runs):.2f} с, "
+          f"импорт {total / 1e6:.2f} с, модулей {len(modules)}")
+    print(f"\n{'package':<28} {'self, ms':>9} {'share':>6} {'modules':>8}")
+    for name, (self_us, count) in sorted(packages.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"{name:<28} {self_us / 1000:>9.1f} {self_us / total:>6.1%} {count:>8}")
+    print(f"\n{'module':<48} {'self, ms':>9}")
+    for name, self_us in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<48} {self_us / 1000:>9.1f}")
+
+
+def first_response(url, timeout):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def time_to_first_200(command, url, env, deadline):
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        command, cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < deadline:
+            if server.poll() is not None:
+                return None
+            if first_response(url, 1) == 200:
+                return time.perf_counter() - started
+            time.sleep(0.02)
+        return None
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def report_startup(args):
+    bind = f'{args.host}:{args.port}'
+    env = dict(os.environ, PYTHONUNBUFFERED='1', GUNICORN_ACCESSLOG='', GUNICORN_BIND=bind, PYTHON_CMD=args.python)
+    if args.entrypoint:
+        command = ['bash', str(ROOT_DIR / 'docker-entrypoint.sh')]
+    else:
+        command = [args.python, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'dojo.wsgi:application']
+    url = f'http://{bind}{args.path}'
+
+    timings = []
+    for _ in range(args.repeat):
+        elapsed = time_to_first_200(command, url, env, args.timeout)
+        if elapsed is None:
+            sys.exit(f"❌ {url} не ответил 200 за {args.timeout:g} с")
+        timings.append(elapsed)
+    print(f"\n🚀 {' '.join(Path(part).name for part in command[:3])}: первый 200 на {args.path} "
+          f"через {statistics.median(timings):.2f} с (медиана), "
+          f"{min(timings):.2f}-{max(timings):.2f} с за {len(timings)} запусков")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Профиль импорта и время до первого ответа Defect Dojo')
+    parser.add_argument('--python', default=sys.executable, help='Интерпретатор приложения')
+    parser.add_argument('--repeat', type=int, default=3, help='Прогонов каждого замера (по умолчанию 3)')
+    parser.add_argument('--top', type=int, default=15, help='Строк в таблицах импорта (по умолчанию 15)')
+    parser.add_argument('--entrypoint', action='store_true', help='Запускать docker-entrypoint.sh, а не только gunicorn')
+    parser.add_argument('--path', default='/health/live', help='Путь первого запроса (по умолчанию /health/live)')
+    parser.add_argument('--timeout', type=float, default=60, help='Предел ожидания первого ответа, секунд')
+    parser.add_argument('--skip-imports', action='store_true', help='Только время до первого ответа')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    if not args.skip_imports:
+        report_imports(args)
+    report_startup(args)
+
+
+if __name__ == '__main__':
+    main()
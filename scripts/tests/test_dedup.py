@@ -0,0 +1,84 @@
+import json
+import os
+from array import array
+
+from gateway_cache import ResultCache
+from gateway_dedup import deduplicate
+from gateway_parsers import SEVERITY_KEYS, parse_report
+from security_gateway import SecurityGateway
+
+SEMGREP_REPORT = {
+    'paths': {'scanned': []},
+    'results': [
+        {'check_id': 'rule', 'path': './dojo/views.py', 'start': {'line': 5},
+         'extra': {'severity': 'ERROR', 'metadata': {'cwe': ['CWE-89: SQL Injection']}}},
+        {'check_id': 'rule', 'path': 'dojo/forms.py', 'start': {'line': 7},
+         'extra': {'severity': 'INFO'}},
+    ],
+}
+BANDIT_REPORT = {
+    'generated_at': '2024-01-01T00:00:00Z',
+    'results': [
+        # Та же находка, что у Semgrep, но с другой критичностью
+        {'test_id': 'B608', 'issue_severity': 'MEDIUM', 'issue_cwe': {'id': 89},
+         'filename': 'dojo/views.py', 'line_number': 5},
+    ],
+}
+
+
+def write_reports(directory):
+    semgrep = directory / 'semgrep-results.json'
+    bandit = directory / 'bandit-results.json'
+    semgrep.write_text(json.dumps(SEMGREP_REPORT))
+    bandit.write_text(json.dumps(BANDIT_REPORT))
+    return [('semgrep', semgrep), ('bandit', bandit)]
+
+
+def test_same_finding_counts_once_at_highest_level(tmp_path):
+    tallies = [parse_report(job) for job in write_reports(tmp_path)]
+
+    unique, by_severity = deduplicate(tallies)
+
+    assert unique['high_vulnerabilities'] == 1
+    assert unique['medium_vulnerabilities'] == 0
+    assert unique['low_vulnerabilities'] == 1
+    assert unique['duplicates'] == 1
+    assert len(by_severity) == len(SEVERITY_KEYS)
+
+
+def test_parse_without_fingerprints_keeps_counts(tmp_path):
+    job = write_reports(tmp_path)[0]
+
+    with_fingerprints = parse_report(job)
+    without = parse_report(job, fingerprints=False)
+
+    assert without['fingerprints'] is None
+    assert [without[key] for key in SEVERITY_KEYS] == [with_fingerprints[key] for key in SEVERITY_KEYS]
+    assert [len(array('Q', blob)) for blob in with_fingerprints['fingerprints']] == [0, 1, 0, 1]
+
+
+def test_cache_separates_runs_without_fingerprints(tmp_path):
+    scanner, path = write_reports(tmp_path)[0]
+    cache = ResultCache(tmp_path / 'cache')
+    full, counts_only = cache.key(scanner, path, 2), cache.key(scanner, path, 2, fingerprints=False)
+    assert full != counts_only
+
+    cache.put(counts_only, parse_report((scanner, path), fingerprints=False))
+    cache.save()
+
+    assert ResultCache(tmp_path / 'cache').get(counts_only)['fingerprints'] is None
+    assert ResultCache(tmp_path / 'cache').get(full) is None
+
+
+def test_gateway_without_dedup_gates_on_all_findings(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'all-results').mkdir()
+    write_reports(tmp_path / 'all-results')
+
+    gateway = SecurityGateway(workers=1, cache_dir='', fingerprints_out='', output=os.devnull,
+                              quiet=True, dedup=False)
+    report = gateway.run()
+
+    assert report['unique_findings'] == {}
+    assert report['total_vulnerabilities'] == 3
+    assert not (tmp_path / 'security-fingerprints.bin').exists()
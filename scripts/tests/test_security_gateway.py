@@ -0,0 +1,65 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'security-gateway.py'
+
+BANDIT_REPORT = {
+    'generated_at': '2024-01-01T00:00:00Z',
+    'results': [
+        {'test_id': 'B602', 'issue_severity': 'HIGH', 'issue_cwe': {'id': 78},
+         'filename': 'dojo/views.py', 'line_number': line}
+        for line in (10, 20)
+    ],
+}
+ZAP_REPORT = {
+    'alerts': [
+        {'pluginid': '10021', 'name': 'Missing header', 'risk': 'Low', 'url': 'https://app.example/items/1'},
+        {'pluginid': '10021', 'name': 'Missing header', 'risk': 'Low', 'url': 'https://app.example/items/2'},
+    ],
+}
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    results = tmp_path / 'all-results'
+    results.mkdir()
+    (results / 'bandit-results.json').write_text(json.dumps(BANDIT_REPORT))
+    (results / 'zap-report.json').write_text(json.dumps(ZAP_REPORT))
+    return tmp_path
+
+
+def run_gateway(workdir, *args):
+    return subprocess.run(
+        [sys.executable, str(SCRIPT), '--write-fingerprints', '', *args],
+        cwd=workdir, capture_output=True, text=True,
+        env={'GATEWAY_CACHE_DIR': '', 'PATH': ''},
+    )
+
+
+def test_jsonl_stdout_is_valid(workdir):
+    result = run_gateway(workdir, '--format', 'jsonl')
+
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [record['type'] for record in records] == ['scan', 'scan', 'summary']
+    summary = records[-1]
+    assert summary['high_vulnerabilities'] == 2
+    # Одна находка ZAP на разных идентификаторах в пути - повтор
+    assert summary['unique_findings']['low_vulnerabilities'] == 1
+    assert result.returncode == 0
+    # Ход работы - в stderr
+    assert 'Security Gateway' in result.stderr
+
+
+def test_sarif_stdout_is_valid(workdir):
+    result = run_gateway(workdir, '--format', 'sarif')
+
+    sarif = json.loads(result.stdout)
+    assert sarif['version'] == '2.1.0'
+    results = sarif['runs'][0]['results']
+    assert {item['ruleId'] for item in results} == {'high_vulnerabilities', 'low_vulnerabilities'}
+    assert sarif['runs'][0]['invocations'][0]['properties']['block_deployment'] is False
+